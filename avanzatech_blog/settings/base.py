@@ -2,6 +2,7 @@ from pathlib import Path
 
 import os
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -92,19 +93,141 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PASSWORD_HASHER_PROFILE picks the hasher for new passwords: pbkdf2 | scrypt | argon2
+# (needs argon2-cffi) | fast (MD5, refused outside settings.test, where it is the default).
+# The other hashers keep verifying older hashes, which are redone with the selected one
+# at the next successful login, so profiles can be switched without downtime.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'user.hashers.TunedScryptPasswordHasher',
+    'argon2': 'user.hashers.TunedArgon2PasswordHasher',
+    'fast': 'django.contrib.auth.hashers.MD5PasswordHasher',
+}
+TEST_SETTINGS_MODULE = 'avanzatech_blog.settings.test'
+
+
+def hashers_for(profile):
+    """ PASSWORD_HASHERS for ``profile``: its hasher first, then the others to verify older hashes. """
+    if profile not in PASSWORD_HASHER_PROFILES:
+        raise ImproperlyConfigured(f'Unknown PASSWORD_HASHER_PROFILE {profile!r}.')
+    return [PASSWORD_HASHER_PROFILES[profile]] + [
+        hasher for name, hasher in PASSWORD_HASHER_PROFILES.items()
+        if name not in (profile, 'fast')
+    ]
+
+
+PASSWORD_HASHER_PROFILE = env('PASSWORD_HASHER_PROFILE', default='pbkdf2')
+if PASSWORD_HASHER_PROFILE == 'fast' and os.environ.get('DJANGO_SETTINGS_MODULE') != TEST_SETTINGS_MODULE:
+    raise ImproperlyConfigured(f'PASSWORD_HASHER_PROFILE=fast is only allowed with {TEST_SETTINGS_MODULE}.')
+PASSWORD_HASHERS = hashers_for(PASSWORD_HASHER_PROFILE)
+SCRYPT_WORK_FACTOR = env.int('SCRYPT_WORK_FACTOR', default=2 ** 14)
+SCRYPT_BLOCK_SIZE = env.int('SCRYPT_BLOCK_SIZE', default=8)
+SCRYPT_PARALLELISM = env.int('SCRYPT_PARALLELISM', default=1)
+ARGON2_TIME_COST = env.int('ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('ARGON2_MEMORY_COST', default=102400)  # KiB
+ARGON2_PARALLELISM = env.int('ARGON2_PARALLELISM', default=8)
+
+
+# JSON_RENDERER=fast encodes responses with orjson (same bytes as the default renderer).
+JSON_RENDERERS = {
+    'default': 'rest_framework.renderers.JSONRenderer',
+    'fast': 'blog.api.renderers.FastJSONRenderer',
+}
+JSON_RENDERER = env('JSON_RENDERER', default='default')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
+        'user.authentication.BearerTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        JSON_RENDERERS[JSON_RENDERER],
+        'rest_framework.renderers.BrowsableAPIRenderer',
     )
 }
 
 AUTH_USER_MODEL = 'user.User'
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+AUTHENTICATION_BACKENDS = ['user.backends.TeamModelBackend']
+
+TOKEN_CACHE_SIZE = env.int('TOKEN_CACHE_SIZE', default=4096)  # bearer tokens kept per process
+TOKEN_CACHE_TTL = env.int('TOKEN_CACHE_TTL', default=300)  # seconds before a cached token is checked again
+
+# LIKE_WRITE_MODE=buffered acknowledges like writes at once and writes them in bulk from a
+# background thread every LIKE_BUFFER_INTERVAL seconds and when the process exits.
+LIKE_WRITE_MODE = env('LIKE_WRITE_MODE', default='direct')
+LIKE_BUFFER_INTERVAL = env.float('LIKE_BUFFER_INTERVAL', default=1.0)
+LIKE_BUFFER_BATCH_SIZE = env.int('LIKE_BUFFER_BATCH_SIZE', default=500)  # intents written per transaction
+LIKE_BUFFER_MAX_SIZE = env.int('LIKE_BUFFER_MAX_SIZE', default=10000)  # waiting intents before writes go direct
+if LIKE_WRITE_MODE == 'buffered' and LIKE_BUFFER_INTERVAL <= 0:
+    # No worker is started without an interval, so intents would only be written at exit.
+    raise ImproperlyConfigured('LIKE_BUFFER_INTERVAL must be positive when LIKE_WRITE_MODE is buffered.')
+LIKE_STATUS_MAX_POSTS = env.int('LIKE_STATUS_MAX_POSTS', default=100)  # post ids per /like/status/ request
+LIKED_POSTS_CACHE_SIZE = env.int('LIKED_POSTS_CACHE_SIZE', default=1000)  # like states cached per user
+
+# Permission snapshots are kept per process and, when CACHE_BACKEND is shared, in the
+# "permissions" alias; a local-memory alias is skipped, as other processes never see its invalidations.
+POST_PERMISSION_CACHE_SIZE = env.int('POST_PERMISSION_CACHE_SIZE', default=1024)  # posts kept per process
+POST_PERMISSION_CACHE_TTL = env.int('POST_PERMISSION_CACHE_TTL', default=5)  # seconds a process trusts its copy; 0 disables it
+
+# The head of the post list is cached once for all anonymous users and once per team in
+# the "visibility" alias, and dropped by generation on writes that change who sees what.
+VISIBLE_POSTS_CACHE_SIZE = env.int('VISIBLE_POSTS_CACHE_SIZE', default=200)  # post ids kept per list
+VISIBLE_POSTS_CACHE_TIMEOUT = env.int('VISIBLE_POSTS_CACHE_TIMEOUT', default=30)  # seconds, bounds staleness on other processes
+
+'''Caches'''
+# CACHE_BACKEND selects one of CACHE_BACKENDS; CACHE_LOCATION is the file cache
+# directory or the redis:// URL. Every alias gets its own key prefix.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_BACKEND = env('CACHE_BACKEND', default='locmem')
+CACHE_LOCATION = env('CACHE_LOCATION', default='')
+CACHE_TIMEOUT = env.int('CACHE_TIMEOUT', default=300)  # seconds
+
+CACHES = {
+    alias: {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': {
+            'locmem': alias,
+            'file': os.path.join(CACHE_LOCATION or os.path.join(BASE_DIR, '.cache'), alias),
+            'redis': CACHE_LOCATION or 'redis://localhost:6379/0',
+        }[CACHE_BACKEND],
+        'TIMEOUT': CACHE_TIMEOUT,
+        'KEY_PREFIX': alias,
+    }
+    for alias in ('default', 'posts', 'permissions', 'reference', 'likes', 'visibility', 'sessions')
+}
+
+# How paginated lists fill total_count: exact | cached | estimated. "cached" keeps
+# counts per visibility class and filter for PAGINATION_COUNT_TIMEOUT seconds;
+# "estimated" trusts the PostgreSQL planner once it expects more than
+# PAGINATION_ESTIMATE_THRESHOLD rows. Clients can send ?count=false to skip it.
+PAGINATION_COUNT_STRATEGY = env('PAGINATION_COUNT_STRATEGY', default='exact')
+PAGINATION_COUNT_TIMEOUT = env.int('PAGINATION_COUNT_TIMEOUT', default=60)
+PAGINATION_ESTIMATE_THRESHOLD = env.int('PAGINATION_ESTIMATE_THRESHOLD', default=100000)
+
+POST_IMPORT_BATCH_SIZE = env.int('POST_IMPORT_BATCH_SIZE', default=500)  # rows per bulk insert
+
+# SESSION_MODE: db | cached_db | signed_cookies. cached_db reads sessions from the
+# "sessions" cache alias and only hits django_session on a miss; signed_cookies keeps
+# the whole session in the signed cookie, so no session storage is used at all.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_MODE = env('SESSION_MODE', default='db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+if SESSION_MODE == 'cached_db' and CACHE_BACKEND == 'locmem':
+    # Each process would keep its own copy, so a logout on one would not end the session on the others.
+    raise ImproperlyConfigured('SESSION_MODE=cached_db needs a shared CACHE_BACKEND (file or redis).')
+SESSION_CACHE_ALIAS = 'sessions'
 
 SESSION_COOKIE_AGE = 1209600  # 2 weeks, in seconds
 
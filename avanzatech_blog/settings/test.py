@@ -0,0 +1,5 @@
+from .local import *
+
+# Hashing cost only slows the suite down, so tests hash with MD5 unless told otherwise.
+PASSWORD_HASHER_PROFILE = env('PASSWORD_HASHER_PROFILE', default='fast')
+PASSWORD_HASHERS = hashers_for(PASSWORD_HASHER_PROFILE)
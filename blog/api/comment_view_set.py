@@ -6,9 +6,11 @@ from rest_framework.status import *
 from django_filters.rest_framework import DjangoFilterBackend
 
 from blog.api.comment_serializers import CommentSerializer
+from blog.api.list_rows import CommentRows
 from blog.models import BlogPost, Comment
 from mixins.pagination_mixin import CommentPagination
 from mixins.queryset_mixin import ListQuerysetMixin
+from user.principal import request_principal
 from permission.permissions import AuthenticateAndCommentPermission
 
 class CommentViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
@@ -25,7 +27,7 @@ class CommentViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
         post = BlogPost.objects.filter(pk=request.data['post_id']).first()
         if post:
             self.check_object_permissions(request, post)
-            user = request.user
+            user = request_principal(request)
             data = {'post': post.id, 'user': user.id, 'comment': request.data['comment']}
             like_serializer = CommentSerializer(data=data)
             if like_serializer.is_valid():
@@ -38,7 +40,7 @@ class CommentViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
     def destroy(self, request, pk=None):
         comment = self.get_serializer().Meta.model.objects.filter(pk=pk).first()        
         if comment:
-            if comment.user.id == request.user.id:
+            if comment.user_id == request_principal(request).id:
                 self.check_object_permissions(request, comment.post)
                 comment.delete()
                 return Response(status=HTTP_204_NO_CONTENT)
@@ -47,8 +49,7 @@ class CommentViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
 
 
     def list(self, request):
-        queryset = self.list_queryset(request.user, Comment, 'post__')
-        queryset = self.filter_queryset(queryset)
-        page = self.paginate_queryset(queryset)
-        likes_serializer = self.get_serializer(page, many=True)
-        return self.get_paginated_response(likes_serializer.data)
+        rows = CommentRows()
+        queryset = self.filter_queryset(self.list_queryset(request_principal(request), Comment, 'post__'))
+        page = self.paginate_queryset(rows.values(queryset))
+        return self.get_paginated_response(rows.build(page))
@@ -8,8 +8,12 @@ class LikeSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
     def to_representation(self, instance):
+        return self.represent(instance.id, instance.post.id, instance.post.title, instance.user)
+
+    @staticmethod
+    def represent(id, post_id, post_title, user):
         return {
-            'id': instance.id,
-            'post': {'id': instance.post.id, 'title': instance.post.title},
-            'user': {'id': instance.user.id, 'nickname': instance.user.nickname, 'email': instance.user.email}
+            'id': id,
+            'post': {'id': post_id, 'title': post_title},
+            'user': {'id': user.id, 'nickname': user.nickname, 'email': user.email}
         }
\ No newline at end of file
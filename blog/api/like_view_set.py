@@ -1,15 +1,24 @@
 from rest_framework import viewsets 
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser
 from rest_framework.status import *
 
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
 
 from blog.api.like_serializers import LikeSerializer
+from blog.api.list_rows import LikeRows
+from blog.like_buffer import buffering, like_buffer
+from blog.liked_posts import liked_post_ids
 from blog.models import BlogPost, Like
 from mixins.pagination_mixin import LikePagination
 from mixins.queryset_mixin import ListQuerysetMixin
+from user.principal import request_principal
 from permission.permissions import AuthenticateAndLikePermission
+from permission.snapshots import get_post_snapshot
+from permission.visibility import readable_by
 
 class LikeViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
     serializer_class = LikeSerializer
@@ -20,36 +29,107 @@ class LikeViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
     filterset_fields = ['post', 'user']
 
 
+    def visible_post(self, request, post_id):
+        """
+        Snapshot of the post after the object permission check, None if the post does
+        not exist. Both come from the permission snapshot cache, not from the posts table.
+        """
+        try:
+            post_id = int(post_id)
+        except (TypeError, ValueError):
+            return None
+        snapshot = get_post_snapshot(post_id)
+        if snapshot is not None:
+            self.check_object_permissions(request, BlogPost(pk=post_id))
+        return snapshot
+
+
+    def buffered(self, post_id, user_id, liked):
+        """
+        Queues the intent for the like buffer and acknowledges it before it is written,
+        None when the buffer is full and the intent has to be written directly.
+        """
+        if like_buffer.record(post_id, user_id, liked):
+            return Response({'post_id': post_id, 'liked': liked}, status=HTTP_202_ACCEPTED)
+        return None
+
+
     def create(self, request):
-        post = BlogPost.objects.filter(pk=request.data['post_id']).first()
-        if post:
-            self.check_object_permissions(request, post)
-            user = request.user
-            data = {'post': post.id, 'user': user.id}
-            like_serializer = LikeSerializer(data=data)
-            if like_serializer.is_valid():
-                like_serializer.save()
-                return Response(like_serializer.data, status=HTTP_201_CREATED)
-            return Response(like_serializer.errors, status=HTTP_400_BAD_REQUEST)
+        snapshot = self.visible_post(request, request.data.get('post_id'))
+        if snapshot:
+            post_id = int(request.data['post_id'])
+            if buffering():
+                response = self.buffered(post_id, request_principal(request).id, True)
+                if response:
+                    return response
+            like_id = Like.objects.add(post_id, request_principal(request).id)
+            if like_id is None:
+                return Response({'non_field_errors': ['The fields post, user must make a unique set.']}, status=HTTP_400_BAD_REQUEST)
+            return Response(LikeSerializer.represent(like_id, post_id, snapshot.title, request.user), status=HTTP_201_CREATED)
+        return Response({'error': 'Post not found.'}, status=HTTP_404_NOT_FOUND)
+
+
+    @action(detail=False, methods=['post'], url_path='toggle', permission_classes=[IsAuthenticated, AuthenticateAndLikePermission])
+    def toggle(self, request):
+        if self.visible_post(request, request.data.get('post_id')):
+            post_id = int(request.data['post_id'])
+            user_id = request_principal(request).id
+            if buffering():
+                liked = like_buffer.liked(post_id, user_id)
+                if liked is None:
+                    liked = post_id in liked_post_ids(user_id, [post_id])
+                if like_buffer.record(post_id, user_id, not liked):
+                    return Response({'post_id': post_id, 'liked': not liked}, status=HTTP_200_OK)
+            liked = Like.objects.add(post_id, user_id) is not None
+            if not liked:
+                Like.objects.remove(post_id, user_id)
+            return Response({'post_id': post_id, 'liked': liked}, status=HTTP_200_OK)
         return Response({'error': 'Post not found.'}, status=HTTP_404_NOT_FOUND)
     
 
+    @action(detail=False, methods=['get'], url_path='status', permission_classes=[IsAuthenticated])
+    def status(self, request):
+        """
+        {post id: liked} of the current user for the readable posts among ``post_ids``,
+        answered from the per user cache and at most one IN query.
+        """
+        limit = getattr(settings, 'LIKE_STATUS_MAX_POSTS', 100)
+        try:
+            post_ids = {int(id) for id in request.query_params.get('post_ids', '').split(',') if id.strip()}
+        except ValueError:
+            return Response({'post_ids': ['Expected a comma separated list of post ids.']}, status=HTTP_400_BAD_REQUEST)
+        if not post_ids:
+            return Response({'post_ids': ['The post_ids param is required.']}, status=HTTP_400_BAD_REQUEST)
+        if len(post_ids) > limit:
+            return Response({'post_ids': [f'At most {limit} post ids are allowed.']}, status=HTTP_400_BAD_REQUEST)
+        user = request_principal(request)
+        posts = BlogPost.objects.filter(pk__in=post_ids)
+        readable = readable_by(user)
+        if readable is not None:
+            posts = posts.filter(readable)
+        post_ids = set(posts.values_list('pk', flat=True))
+        liked = liked_post_ids(user.id, post_ids)
+        states = {}
+        for post_id in sorted(post_ids):
+            pending = like_buffer.liked(post_id, user.id)
+            states[post_id] = post_id in liked if pending is None else pending
+        return Response(states, status=HTTP_200_OK)
+
+
     def destroy(self, request, pk=None):
-        post = BlogPost.objects.filter(pk=pk).first()
-        user_id = request.user.id
-        if post:
-            like = self.get_serializer().Meta.model.objects.filter(post_id=post.id, user_id=user_id).first()    
-            if like:
-                self.check_object_permissions(request, like.post)
-                like.delete()
+        if self.visible_post(request, pk):
+            if buffering():
+                response = self.buffered(int(pk), request_principal(request).id, False)
+                if response:
+                    return response
+            if Like.objects.remove(int(pk), request_principal(request).id):
                 return Response(status=HTTP_204_NO_CONTENT)
             return Response({'error': 'You have not liked this post.'}, status=HTTP_400_BAD_REQUEST)
         return Response({'error': 'Like not found.'}, status=HTTP_404_NOT_FOUND)
     
     
     def list(self, request):
-        queryset = self.list_queryset(request.user, Like, 'post__').prefetch_related('user')
-        queryset = self.filter_queryset(queryset)
-        page = self.paginate_queryset(queryset)
-        likes_serializer = self.get_serializer(page, many=True)
-        return self.get_paginated_response(likes_serializer.data)
+        rows = LikeRows()
+        queryset = self.filter_queryset(self.list_queryset(request_principal(request), Like, 'post__'))
+        page = self.paginate_queryset(rows.values(queryset))
+        return self.get_paginated_response(rows.build(page))
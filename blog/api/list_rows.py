@@ -0,0 +1,176 @@
+from abc import ABC, abstractmethod
+
+from rest_framework import serializers
+
+from blog.like_buffer import seen_by
+from blog.liked_posts import liked_post_ids
+from caching.counting_cache import post_bodies
+from permission.models import PostPermission
+from user.models import User
+
+
+class ListRows(ABC):
+    """
+    Read path of the list endpoints: pages are fetched with ``values()`` and turned
+    into response dicts directly, without model instances or serializers.
+    """
+    columns = ()
+
+    def values(self, queryset):
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def build(self, rows):
+        return [self.row(row) for row in rows]
+
+    def stream(self, queryset, chunk_size=500):
+        """ Lazily built items of every row of ``queryset``, read in chunks. """
+        return (self.row(row) for row in queryset.iterator(chunk_size=chunk_size))
+
+    @abstractmethod
+    def row(self, row):
+        """ The response item of one ``values()`` row. """
+
+
+class LikeRows(ListRows):
+    columns = ('id', 'created_at', 'post_id', 'post__title', 'user_id', 'user__email')
+
+    def row(self, row):
+        return {
+            'id': row['id'],
+            'post': {'id': row['post_id'], 'title': row['post__title']},
+            'user': {'id': row['user_id'], 'nickname': User.nickname_of(row['user__email']), 'email': row['user__email']}
+        }
+
+
+class CommentRows(ListRows):
+    columns = ('id', 'comment', 'created_at', 'post_id', 'post__title', 'user_id', 'user__email')
+
+    def row(self, row):
+        return {
+            'id': row['id'],
+            'comment': row['comment'],
+            'created_at': row['created_at'],
+            'post': {'id': row['post_id'], 'title': row['post__title']},
+            'user': {'id': row['user_id'], 'nickname': User.nickname_of(row['user__email']), 'email': row['user__email']},
+        }
+
+
+class PostCommentRows(CommentRows):
+    """ Comments of one post, whose title is known up front, so no join to the posts table. """
+    columns = ('id', 'comment', 'created_at', 'post_id', 'user_id', 'user__email')
+
+    def __init__(self, post_title):
+        self.post_title = post_title
+
+    def row(self, row):
+        return super().row({**row, 'post__title': self.post_title})
+
+
+class PostRows(ListRows):
+    """
+    List items carry the excerpt instead of the post body; ``fields`` narrows them
+    to a sparse fieldset. The user independent part of each item is cached per post
+    version like BlogPostSerializer does for the detail view. The author is not part
+    of it: author and team edits leave the post version alone, so it is built from
+    the columns of every read.
+    """
+    body_fields = ('id', 'title', 'excerpt', 'createdAt', 'permissions')
+    # Columns each representation field reads; the key and cursor columns are always loaded.
+    field_columns = {
+        'id': (), 'title': ('title',), 'excerpt': ('excerpt',), 'createdAt': (),
+        'author': ('author_id', 'author__email', 'author__team_id', 'author__team__name'),
+        'permissions': (), 'likes': ('like_count',), 'comments': ('comment_count',), 'post_liked': ()
+    }
+    key_columns = ('id', 'created_at', 'updated_at', 'access_mask')
+
+    def __init__(self, user, fields=None):
+        self.user = user
+        self.fields = fields
+
+    @classmethod
+    def parse_fields(cls, value):
+        """ Turns the ``fields`` query param into a set of fields, None when absent. """
+        if value is None:
+            return None
+        fields = {field.strip() for field in value.split(',') if field.strip()}
+        unknown = fields - cls.field_columns.keys()
+        if unknown:
+            raise serializers.ValidationError({'fields': [f'Unknown field "{field}".' for field in sorted(unknown)]})
+        return fields
+
+    def wants(self, field):
+        if field == 'post_liked' and not self.user.is_authenticated:
+            return False
+        return self.fields is None or field in self.fields
+
+    @property
+    def columns(self):
+        columns = dict.fromkeys(self.key_columns)
+        for field, field_columns in self.field_columns.items():
+            if self.wants(field):
+                columns.update(dict.fromkeys(field_columns))
+        return tuple(columns)
+
+    def body_key(self, row):
+        key = f"post-body:list:{row['id']}:{row['updated_at'].isoformat()}:{row['access_mask']}"
+        if self.fields is None:
+            return key
+        return f"{key}:{','.join(sorted(self.fields & set(self.body_fields)))}"
+
+    def build(self, rows):
+        self.liked = liked_post_ids(self.user.id, [row['id'] for row in rows]) if self.wants('post_liked') else set()
+        keys = {row['id']: self.body_key(row) for row in rows}
+        bodies = post_bodies.get_many(keys.values())
+        missing = [row for row in rows if keys[row['id']] not in bodies]
+        if missing:
+            built = {keys[row['id']]: body for row, body in zip(missing, self.bodies(missing))}
+            post_bodies.set_many(built)
+            bodies.update(built)
+        fields = [field for field in self.field_columns if self.wants(field)]
+        items = []
+        for row in rows:
+            values = {**bodies[keys[row['id']]], **self.extras(row)}
+            items.append({field: values[field] for field in fields})
+        return items
+
+    def row(self, row):
+        return self.build([row])[0]
+
+    def bodies(self, rows):
+        permissions = self.permissions([row['id'] for row in rows]) if self.wants('permissions') else {}
+        builders = {
+            'id': lambda row: row['id'],
+            'title': lambda row: row['title'],
+            'excerpt': lambda row: row['excerpt'],
+            'createdAt': lambda row: row['created_at'],
+            'permissions': lambda row: permissions.get(row['id'], {})
+        }
+        fields = [field for field in self.body_fields if self.wants(field)]
+        return [{field: builders[field](row) for field in fields} for row in rows]
+
+    def permissions(self, post_ids):
+        """ category name -> permission of each post, in one query for the whole page. """
+        permissions = {}
+        rows = PostPermission.objects.filter(post_id__in=post_ids).order_by('id').values_list(
+            'post_id', 'category__name', 'permission_id', 'permission__name'
+        )
+        for post_id, category, permission_id, permission in rows:
+            permissions.setdefault(post_id, {})[category] = {'id': permission_id, 'name': permission}
+        return permissions
+
+    def extras(self, row):
+        extras = {'likes': 'like_count', 'comments': 'comment_count'}
+        extras = {field: row[column] for field, column in extras.items() if self.wants(field)}
+        if self.wants('author'):
+            extras['author'] = {
+                'id': row['author_id'],
+                'nickname': User.nickname_of(row['author__email']),
+                'email': row['author__email'],
+                'team': {'id': row['author__team_id'], 'name': row['author__team__name']}
+            }
+        if self.wants('post_liked'):
+            liked, likes = seen_by(self.user.id, row['id'], row['id'] in self.liked, row.get('like_count', 0))
+            extras['post_liked'] = liked
+            if 'likes' in extras:
+                extras['likes'] = likes
+        return extras
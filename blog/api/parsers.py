@@ -0,0 +1,26 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+from blog.importer import csv_rows, ndjson_rows
+
+
+class StreamingRowsParser(BaseParser):
+    """ Returns a lazy iterator of rows so large bodies are never decoded in one piece. """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        return self.rows(codecs.iterdecode(stream, encoding))
+
+
+class NDJSONParser(StreamingRowsParser):
+    media_type = 'application/x-ndjson'
+    rows = staticmethod(ndjson_rows)
+
+
+class CSVParser(StreamingRowsParser):
+    media_type = 'text/csv'
+    rows = staticmethod(csv_rows)
@@ -1,9 +1,11 @@
 from django.db import transaction
-from django.core.exceptions import ObjectDoesNotExist 
 from django.contrib.auth.models import AnonymousUser
 from rest_framework import serializers
 
+from ..like_buffer import seen_by
+from ..liked_posts import liked_post_ids
 from ..models import BlogPost
+from caching.counting_cache import post_bodies
 from permission.models import PostPermission, Category, Permission, CategoryName
 
 class BlogPostSerializer(serializers.ModelSerializer):
@@ -11,35 +13,54 @@ class BlogPostSerializer(serializers.ModelSerializer):
         model = BlogPost
         fields = ('id', 'title', 'content', 'author')
 
+    def body_key(self, instance: BlogPost):
+        # access_mask changes with every permission write, updated_at with every post edit.
+        return f'post-body:full:{instance.id}:{instance.updated_at.isoformat()}:{instance.access_mask}'
+
     def to_representation(self, instance: BlogPost):
+        body = post_bodies.get_or_set(self.body_key(instance), lambda: self.body_representation(instance))
         response = {
+            **body,
+            'author': self.author_representation(instance.author),
+            'likes': instance.like_count,
+            'comments': instance.comment_count
+        }
+        user = self.context.get('request').user
+        if not isinstance(user, AnonymousUser):
+            liked = instance.id in liked_post_ids(user.id, [instance.id])
+            response['post_liked'], response['likes'] = seen_by(user.id, instance.id, liked, instance.like_count)
+        return response
+
+    def body_representation(self, instance: BlogPost):
+        """
+        The user independent part of the representation, cached per post version. The
+        author is left out, since editing the author or their team leaves the version alone.
+        """
+        return {
             'id': instance.id,
             'title': instance.title,
             'content': instance.content,
             'content_html': instance.content_html,
             'excerpt': instance.excerpt,
             'createdAt': instance.created_at,
-            'author': {
-                'id': instance.author.id, 
-                'nickname': instance.author.nickname, 
-                'email': instance.author.email, 
-                'team': {
-                  'id': instance.author.team.id,
-                  'name': instance.author.team.name  
-                } 
-            },
             'permissions': {
                 cat_perm.category.name: {'id':cat_perm.permission.id, 'name':cat_perm.permission.name} for cat_perm in instance.reverse_post.all()
-            },
-            'likes': instance.likes.count(),
-            'comments': instance.comments.count()
+            }
         }
-        user = self.context.get('request').user
-        if not isinstance(user, AnonymousUser):
-            like_count = instance.likes.filter(id=user.id).count()
-            response['post_liked'] = True if like_count > 0 else False;
-        return response
         
+    @staticmethod
+    def author_representation(author):
+        return {
+            'id': author.id, 
+            'nickname': author.nickname, 
+            'email': author.email, 
+            'team': {
+              'id': author.team.id,
+              'name': author.team.name  
+            } 
+        }
+
+
 class PostPermissionSerializer(serializers.Serializer):
     category_id = serializers.IntegerField()
     permission_id = serializers.IntegerField()
@@ -57,6 +78,15 @@ class BlogPostCreateSerializer(serializers.ModelSerializer):
         set_categories = set([permission['category_id'] for permission in permissions])
         if len(set_categories) != len(allowed_categories):
             raise serializers.ValidationError("Missing permission for some category.")
+        if len(permissions) != len(set_categories):
+            raise serializers.ValidationError("Each category must have a single permission.")
+        category_ids = Category.reference_ids()
+        permission_ids = Permission.reference_ids()
+        for permission_dict in permissions:
+            if permission_dict['category_id'] not in category_ids:
+                raise serializers.ValidationError("Category matching query does not exist.")
+            if permission_dict['permission_id'] not in permission_ids:
+                raise serializers.ValidationError("Permission matching query does not exist.")
         return permissions
 
     @transaction.atomic
@@ -77,11 +107,16 @@ class BlogPostCreateSerializer(serializers.ModelSerializer):
         return instance
     
     def _save_permissions(self, permissions_data, post):
-        for permission_dict in permissions_data:
-            try:    
-                categoryObj = Category.objects.get(pk=permission_dict['category_id'])
-                permissionObj = Permission.objects.get(pk=permission_dict['permission_id'])
-            except ObjectDoesNotExist as err:
-                raise serializers.ValidationError({'permissions': [err]})
-            PostPermission.objects.update_or_create(category=categoryObj, post=post, defaults={'permission':permissionObj})
+        PostPermission.objects.bulk_create(
+            self.build_permissions(permissions_data, post),
+            update_conflicts=True,
+            unique_fields=['post', 'category'],
+            update_fields=['permission']
+        )
 
+    @staticmethod
+    def build_permissions(permissions_data, post):
+        return [
+            PostPermission(post=post, category_id=permission_dict['category_id'], permission_id=permission_dict['permission_id'])
+            for permission_dict in permissions_data
+        ]
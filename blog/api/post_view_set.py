@@ -1,17 +1,29 @@
 from rest_framework import viewsets 
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import *
 from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
 
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 
-from blog.models import BlogPost
+from blog.models import BlogPost, Comment
 from blog.filters import PostFilter
+from blog.importer import PostImporter
+from blog.search import search_posts
 
+from .parsers import CSVParser, NDJSONParser
+from .list_rows import PostCommentRows, PostRows
 from .post_serializers import BlogPostCreateSerializer, BlogPostSerializer
-from mixins.pagination_mixin import BlogPostPagination
+from .renderers import NDJSONRenderer
+from mixins.pagination_mixin import BlogPostPagination, CommentPagination, KeysetPagination, SearchPagination
 from permission.permissions import AuthenticateAndPostEdit
 from mixins.queryset_mixin import ListQuerysetMixin
+from permission.snapshots import get_post_snapshot
+from permission.visibility import visible_window
+from user.principal import request_principal
 
 
 class BlogPostViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
@@ -25,13 +37,13 @@ class BlogPostViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
 
     def get_queryset(self, pk=None):
         if pk is not None:
-            return self.get_serializer().Meta.model.objects.prefetch_related('reverse_post__category', 'reverse_post__permission', 'author').filter(id=pk).first()
+            queryset = self.get_serializer().Meta.model.objects.prefetch_related('reverse_post__category', 'reverse_post__permission', 'author__team')
+            return queryset.filter(id=pk).first()
 
 
     def create(self, request):
         data = request.data
-        user = request.user
-        data.update({'author': user.id})
+        data.update({'author': request_principal(request).id})
         post_serializer = BlogPostCreateSerializer(data=data)
         if post_serializer.is_valid():
             post_serializer.save()
@@ -39,6 +51,19 @@ class BlogPostViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
         return Response(post_serializer.errors, status=HTTP_400_BAD_REQUEST)
     
 
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[NDJSONParser, CSVParser], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        try:
+            batch_size = int(request.query_params['batch_size']) if 'batch_size' in request.query_params else None
+        except ValueError:
+            batch_size = 0
+        if batch_size is not None and batch_size < 1:
+            return Response({'error': 'batch_size must be a positive integer.'}, status=HTTP_400_BAD_REQUEST)
+        principal = request_principal(request)
+        importer = PostImporter(principal.id, batch_size, allow_row_author=principal.is_admin)
+        return Response(importer.run(request.data), status=HTTP_200_OK)
+    
+
     def update(self, request, pk=None):
         post = self.get_queryset(pk)
         if post:
@@ -54,13 +79,51 @@ class BlogPostViewSet(viewsets.GenericViewSet, ListQuerysetMixin):
     
 
     def list(self, request):
-        user = request.user
-        posts = self.list_queryset(user, BlogPost).prefetch_related('likes', 'comments')
-        page = self.paginate_queryset(self.filter_queryset(posts))
-        post_serializer = self.get_serializer(page, many=True)
-        return self.get_paginated_response(post_serializer.data)
+        user = request_principal(request)
+        filtered = set(request.query_params) & set(self.filterset_class.base_filters)
+        return self.rows_response(self.list_queryset(user, BlogPost), None if filtered else visible_window(user))
+
+
+    @action(detail=False, methods=['get'], url_path='search', pagination_class=SearchPagination)
+    def search(self, request):
+        terms = request.query_params.get('q', '').strip()
+        if not terms:
+            return Response({'error': 'The q param is required.'}, status=HTTP_400_BAD_REQUEST)
+        posts = search_posts(self.list_queryset(request_principal(request), BlogPost), terms)
+        return self.rows_response(posts.order_by('-search_rank', '-created_at', '-id'))
+
+
+    def rows_response(self, posts, window=None):
+        """ Paginated list items built by PostRows from the visible ``posts``, paged on ``window`` when it can. """
+        user = request_principal(self.request)
+        rows = PostRows(user, PostRows.parse_fields(self.request.query_params.get('fields')))
+        posts = rows.values(self.filter_queryset(posts))
+        page = self.paginator.paginate_window(window, posts, self.request)
+        if page is None:
+            page = self.paginate_queryset(posts)
+        return self.get_paginated_response(rows.build(page))
     
 
+    @action(detail=True, methods=['get'], url_path='comments', renderer_classes=[*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer])
+    def comments(self, request, pk=None):
+        """
+        Comments of one post, newest first. Read access is checked once on the post and
+        the comments are keyset paginated, or streamed whole with ``?format=ndjson``.
+        """
+        snapshot = get_post_snapshot(int(pk)) if pk.isdigit() else None
+        if snapshot is None:
+            return Response({'error': 'Post not found.'}, status=HTTP_404_NOT_FOUND)
+        self.check_object_permissions(request, BlogPost(pk=int(pk)))
+        rows = PostCommentRows(snapshot.title)
+        comments = rows.values(Comment.objects.filter(post_id=int(pk)))
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            items = rows.stream(comments.order_by('-created_at', '-id'))
+            return StreamingHttpResponse(map(request.accepted_renderer.line, items), content_type=NDJSONRenderer.media_type)
+        paginator = KeysetPagination(CommentPagination.page_size)
+        page = paginator.paginate_queryset(comments, request, self)
+        return paginator.get_paginated_response(rows.build(page))
+
+
     def retrieve(self, request, pk=None):
         post = self.get_queryset(pk)
         if post:
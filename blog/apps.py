@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def restore_search_triggers(sender, using, **kwargs):
+    """ SQLite loses the FTS triggers when a migration rebuilds blog_posts. """
+    from .search import restore_search_triggers
+
+    restore_search_triggers(connections[using])
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        post_migrate.connect(restore_search_triggers, sender=self)
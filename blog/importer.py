@@ -0,0 +1,131 @@
+import csv
+import json
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from blog.api.post_serializers import BlogPostCreateSerializer
+from blog.models import BlogPost, excerpt_of
+from permission.models import PostPermission
+from user.models import User
+
+
+class BlogPostImportSerializer(BlogPostCreateSerializer):
+    """ Same rules as the create endpoint; the author id is checked per batch by the importer. """
+    author = serializers.IntegerField(min_value=1, required=False)
+
+    class Meta(BlogPostCreateSerializer.Meta):
+        fields = ('title', 'content', 'content_html', 'permissions', 'author')
+
+
+def ndjson_rows(lines):
+    """ Yields one dict per non empty line, or the ValueError raised while decoding it. """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as err:
+            yield err
+
+
+def csv_rows(lines):
+    """ Yields one dict per CSV record; the ``permissions`` column holds the JSON list. """
+    for row in csv.DictReader(lines):
+        try:
+            row['permissions'] = json.loads(row.get('permissions') or '[]')
+        except ValueError as err:
+            yield err
+            continue
+        yield row
+
+
+class PostImporter:
+    """
+    Validates rows with the create serializer rules and writes posts and their
+    permissions with ``bulk_create`` every ``batch_size`` valid rows. Invalid rows are
+    reported by line number and never stop the import.
+    """
+
+    def __init__(self, author_id=None, batch_size=None, allow_row_author=False):
+        self.author_id = author_id
+        self.batch_size = getattr(settings, 'POST_IMPORT_BATCH_SIZE', 500) if batch_size is None else batch_size
+        if self.batch_size < 1:
+            raise ValueError('batch_size must be a positive integer.')
+        self.allow_row_author = allow_row_author
+
+    def run(self, rows):
+        self.created = 0
+        self.errors = []
+        batch = []
+        for line, row in enumerate(rows, start=1):
+            entry = self.validate(line, row)
+            if entry is not None:
+                batch.append(entry)
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        return {'created': self.created, 'errors': self.errors}
+
+    def validate(self, line, row):
+        if isinstance(row, ValueError):
+            self.errors.append({'line': line, 'errors': {'non_field_errors': [f'Invalid row: {row}']}})
+            return None
+        if not isinstance(row, dict):
+            self.errors.append({'line': line, 'errors': {'non_field_errors': ['Each row must be an object.']}})
+            return None
+        if not self.allow_row_author or row.get('author') in (None, ''):
+            row = {key: value for key, value in row.items() if key != 'author'}
+        serializer = BlogPostImportSerializer(data=row)
+        if not serializer.is_valid():
+            self.errors.append({'line': line, 'errors': serializer.errors})
+            return None
+        data = serializer.validated_data
+        return line, data.pop('author', self.author_id), data
+
+    def flush(self, batch):
+        authors = dict(User.objects.filter(id__in={author_id for _, author_id, _ in batch}).values_list('id', 'team_id'))
+        valid = []
+        for line, author_id, data in batch:
+            if author_id in authors:
+                valid.append((line, author_id, data))
+            else:
+                self.errors.append({'line': line, 'errors': {'author': [f'Invalid pk "{author_id}" - object does not exist.']}})
+        if not valid:
+            return
+        try:
+            self.created += self.write(valid, authors)
+        except DatabaseError:
+            # The batch is one statement per table; retry its rows alone to find the bad ones.
+            for entry in valid:
+                try:
+                    self.created += self.write([entry], authors)
+                except DatabaseError as err:
+                    self.errors.append({'line': entry[0], 'errors': {'non_field_errors': [str(err)]}})
+
+    @staticmethod
+    def write(entries, teams):
+        """
+        Inserts the posts and permissions of (line, author id, data) entries; returns the
+        posts written. ``teams`` maps each author to their team.
+        """
+        with transaction.atomic():
+            posts = BlogPost.objects.bulk_create([
+                BlogPost(
+                    author_id=author_id,
+                    author_team_id=teams[author_id],
+                    title=data['title'],
+                    content=data['content'],
+                    content_html=data['content_html'],
+                    excerpt=excerpt_of(data['content_html'])
+                ) for _, author_id, data in entries
+            ])
+            PostPermission.objects.bulk_create([
+                permission
+                for post, (_, _, data) in zip(posts, entries)
+                for permission in BlogPostCreateSerializer.build_permissions(data['permissions'], post)
+            ])
+        return len(posts)
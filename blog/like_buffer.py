@@ -0,0 +1,147 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def batch_size():
+    return getattr(settings, 'LIKE_BUFFER_BATCH_SIZE', 500)
+
+
+def max_size():
+    return getattr(settings, 'LIKE_BUFFER_MAX_SIZE', 10000)
+
+
+def write_batch(intents):
+    """
+    Applies {(post id, user id): liked} in one transaction: a bulk delete and a bulk
+    insert that skips existing likes, each moving like_count by the rows it changed.
+    """
+    from .liked_posts import forget_liked
+    from .models import BlogPost, Like
+    from user.models import User
+
+    adds = [pair for pair, liked in intents.items() if liked]
+    removes = [pair for pair, liked in intents.items() if not liked]
+    with transaction.atomic():
+        if removes:
+            Like.objects.remove_many(removes)
+        if adds:
+            # Posts or users deleted while the intent waited are dropped, not inserted.
+            posts = set(BlogPost.objects.filter(pk__in={post_id for post_id, _ in adds}).values_list('pk', flat=True))
+            users = set(User.objects.filter(pk__in={user_id for _, user_id in adds}).values_list('pk', flat=True))
+            adds = [(post_id, user_id) for post_id, user_id in adds if post_id in posts and user_id in users]
+            if adds:
+                Like.objects.add_many(adds)
+        forget_liked(*{user_id for _, user_id in intents})
+
+
+class LikeBuffer:
+    """
+    Like and unlike intents waiting to be written, deduplicated per (post, user) so
+    only the last intent of a pair reaches the database. A daemon thread flushes them
+    every ``LIKE_BUFFER_INTERVAL`` seconds, or sooner once a batch is full. At most
+    ``LIKE_BUFFER_MAX_SIZE`` pairs wait; past that the caller writes the intent itself.
+
+    Intents live in this process until written; ``seen_by`` lays them over what the
+    database says so the acting user reads their own likes.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = None
+
+    def record(self, post_id, user_id, liked):
+        """ Queues the intent. Returns False, queuing nothing, when the buffer is full. """
+        with self._lock:
+            pair = (post_id, user_id)
+            # A pair already waiting is always replaced, so no direct write can overtake it.
+            queued = pair in self._pending or pair in self._inflight or len(self._pending) < max_size()
+            if queued:
+                self._pending[pair] = liked
+            full = len(self._pending) >= batch_size()
+        self.start()
+        if full or not queued:
+            self._wake.set()
+        return queued
+
+    def liked(self, post_id, user_id):
+        """ The unwritten intent of the user on the post, None when there is none. """
+        with self._lock:
+            pair = (post_id, user_id)
+            return self._pending.get(pair, self._inflight.get(pair))
+
+    def flush(self):
+        """ Writes every pending intent in batches. Returns the number written. """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    pairs = list(self._pending)[:batch_size()]
+                    self._inflight = {pair: self._pending.pop(pair) for pair in pairs}
+                if not self._inflight:
+                    return written
+                try:
+                    write_batch(self._inflight)
+                except Exception:
+                    with self._lock:
+                        # Newer intents recorded meanwhile win over the failed ones.
+                        self._pending = {**self._inflight, **self._pending}
+                        self._inflight = {}
+                    raise
+                written += len(self._inflight)
+                with self._lock:
+                    self._inflight = {}
+
+    def start(self):
+        interval = getattr(settings, 'LIKE_BUFFER_INTERVAL', 1.0)
+        # Settings refuse 0 in buffered mode; tests use it to flush by hand.
+        if self._worker is not None or not interval:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, args=(interval,), name='like-buffer', daemon=True)
+                self._worker.start()
+                atexit.register(self.flush)
+
+    def _run(self, interval):
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # The worker must outlive any failure, or the intents would pile up unwritten.
+                logger.exception('Like buffer flush failed; the intents are retried on the next run.')
+            finally:
+                close_old_connections()
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+like_buffer = LikeBuffer()
+
+
+def buffering():
+    return getattr(settings, 'LIKE_WRITE_MODE', 'direct') == 'buffered'
+
+
+def seen_by(user_id, post_id, liked, likes):
+    """ (liked, likes) of the post as the user sees it, counting their unwritten intent. """
+    pending = like_buffer.liked(post_id, user_id)
+    if pending is None or pending == liked:
+        return liked, likes
+    return pending, max(likes + (1 if pending else -1), 0)
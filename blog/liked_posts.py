@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from caching.counting_cache import liked_posts
+
+
+def version_key(user_id):
+    return f'liked-posts:version:{user_id}'
+
+
+def liked_version(user_id):
+    """ Current version of the user's like states; every like write moves it on. """
+    key = version_key(user_id)
+    version = liked_posts.get(key)
+    if version is None:
+        # A fresh start never reuses the version of an entry written before an eviction.
+        liked_posts.add(key, time.time_ns(), None)
+        version = liked_posts.get(key)
+    return version
+
+
+def liked_key(user_id, version):
+    return f'liked-posts:{user_id}:{version}'
+
+
+def load_liked(user_id, post_ids):
+    from .models import Like
+
+    return set(Like.objects.filter(user_id=user_id, post_id__in=post_ids).values_list('post_id', flat=True))
+
+
+def liked_post_ids(user_id, post_ids):
+    """
+    The ids among ``post_ids`` the user liked. What is known is cached per user as
+    {post id: liked}; the ids the cache does not know are read in one IN query. Entries
+    are stored under the version read before the query, so a fill racing a like write
+    lands on a version nobody reads any more.
+    """
+    post_ids = set(post_ids)
+    key = liked_key(user_id, liked_version(user_id))
+    known = liked_posts.get(key) or {}
+    unknown = post_ids - known.keys()
+    if unknown:
+        liked = load_liked(user_id, unknown)
+        known = {**known, **{post_id: post_id in liked for post_id in unknown}}
+        limit = getattr(settings, 'LIKED_POSTS_CACHE_SIZE', 1000)
+        if len(known) > limit:
+            known = dict(list(known.items())[-limit:])
+        liked_posts.set(key, known)
+    return {post_id for post_id in post_ids if known.get(post_id)}
+
+
+def forget_liked(*user_ids):
+    """ Moves the users' versions on, now and once the transaction commits. """
+    user_ids = set(user_ids)
+
+    def invalidate():
+        for user_id in user_ids:
+            try:
+                liked_posts.incr(version_key(user_id))
+            except ValueError:
+                liked_posts.add(version_key(user_id), time.time_ns(), None)
+
+    invalidate()
+    transaction.on_commit(invalidate)
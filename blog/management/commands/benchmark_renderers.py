@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+from timeit import Timer
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from blog.api.renderers import FastJSONRenderer
+
+
+def sample_page(items):
+    """ A paginated post list shaped like the list endpoint's response. """
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    return {
+        'next': 'http://localhost:8000/post/?page=2',
+        'previous': None,
+        'total_count': items * 10,
+        'current_page': 1,
+        'total_pages': 10,
+        'results': [
+            {
+                'id': id,
+                'title': f'Post title {id}',
+                'excerpt': '<p>Some content for some post créé, with “quotes” and a line break.</p>' * 2,
+                'createdAt': created_at - timedelta(minutes=id),
+                'author': {'id': id % 7, 'nickname': 'some', 'email': 'user@example.com', 'team': {'id': 1, 'name': 'Rookie'}},
+                'permissions': {
+                    category: {'id': 2, 'name': 'read'} for category in ('public', 'auth', 'team', 'author')
+                },
+                'likes': id * 3,
+                'comments': id,
+                'post_liked': id % 2 == 0
+            } for id in range(1, items + 1)
+        ]
+    }
+
+
+class Command(BaseCommand):
+    help = 'Times JSONRenderer against FastJSONRenderer on a post list page.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100, help='Posts per page.')
+        parser.add_argument('--rounds', type=int, default=1000, help='Renders timed per renderer.')
+
+    def handle(self, *args, **options):
+        page = sample_page(options['items'])
+        rounds = options['rounds']
+        renderers = {'default': JSONRenderer(), 'fast': FastJSONRenderer()}
+        if len({renderer.render(page) for renderer in renderers.values()}) != 1:
+            raise CommandError('Renderers disagree on the sample page.')
+        for name, renderer in renderers.items():
+            seconds = min(Timer(lambda: renderer.render(page)).repeat(3, rounds))
+            self.stdout.write(f'{name}: {seconds / rounds * 1e6:.1f} us per {options["items"]} item page')
@@ -0,0 +1,41 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importer import PostImporter, csv_rows, ndjson_rows
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = 'Imports posts and their permissions from an NDJSON or CSV file in bulk batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin.")
+        parser.add_argument('--format', choices=['ndjson', 'csv'], help='Defaults to the file extension.')
+        parser.add_argument('--author', help='Email of the author for rows without an "author" id.')
+        parser.add_argument('--batch-size', type=int, help='Valid rows written per bulk insert.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer.')
+        path = options['path']
+        format = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        author_id = None
+        if options['author']:
+            author_id = User.objects.filter(email=options['author']).values_list('id', flat=True).first()
+            if author_id is None:
+                raise CommandError(f"User {options['author']} does not exist.")
+
+        source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            rows = csv_rows(source) if format == 'csv' else ndjson_rows(source)
+            importer = PostImporter(author_id, options['batch_size'], allow_row_author=True)
+            result = importer.run(rows)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {result['created']} posts, {len(result['errors'])} rows failed."))
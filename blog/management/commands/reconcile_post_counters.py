@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from blog.models import BlogPost, Comment, Like, count_of, recount_post_counters
+
+
+class Command(BaseCommand):
+    help = 'Recomputes BlogPost.like_count and BlogPost.comment_count from the likes and comments tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts checked per UPDATE statement.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        checked = 0
+        fixed = 0
+        while True:
+            batch = list(BlogPost.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            drifted = list(
+                BlogPost.objects.filter(pk__in=batch)
+                .annotate(real_like_count=count_of(Like), real_comment_count=count_of(Comment))
+                .exclude(like_count=F('real_like_count'), comment_count=F('real_comment_count'))
+                .values_list('pk', flat=True)
+            )
+            if drifted:
+                fixed += recount_post_counters(drifted)
+            checked += len(batch)
+            last_id = batch[-1]
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} posts, fixed counters on {fixed}.'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_blogpost_content_html_alter_blogpost_content_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='access_mask',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='access mask'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+def excerpt_of(html, length=200):
+    """ Frozen copy of blog.models.excerpt_of as of this migration. """
+    excerpt = html[:length]
+    if len(html) <= length:
+        return excerpt
+    open_tag = excerpt.rfind('<')
+    if open_tag > excerpt.rfind('>'):
+        excerpt = excerpt[:open_tag]
+    entity = excerpt.rfind('&')
+    if entity > excerpt.rfind(';') and not any(char.isspace() for char in excerpt[entity:]):
+        excerpt = excerpt[:entity]
+    return excerpt
+
+
+def backfill_excerpts(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    posts = []
+    for post in BlogPost.objects.only('id', 'content_html').iterator(chunk_size=1000):
+        post.excerpt = excerpt_of(post.content_html)
+        posts.append(post)
+    BlogPost.objects.bulk_update(posts, ['excerpt'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_blogpost_like_count_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=200, verbose_name='excerpt'),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+# PostFilter.title runs icontains, which PostgreSQL compiles to UPPER(title) LIKE UPPER(%s).
+# A trigram GIN index on that expression serves it; other databases keep the seq scan.
+def create_title_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute('CREATE INDEX IF NOT EXISTS blog_post_title_trgm_idx ON blog_posts USING gin (UPPER(title) gin_trgm_ops)')
+
+
+def drop_title_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS blog_post_title_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_blogpost_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['-created_at', '-id'], name='blog_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'user'], name='comment_post_user_idx'),
+        ),
+        migrations.RunPython(create_title_trigram_index, drop_title_trigram_index),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations
+
+# Frozen copy of the search structures as of this migration; later changes to blog.search
+# must not change history. PostgreSQL keeps a weighted tsvector as a generated column
+# behind a GIN index, SQLite an external content FTS5 table kept in step by triggers.
+FTS_TRIGGERS = {
+    'blog_posts_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_insert AFTER INSERT ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+    'blog_posts_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_delete AFTER DELETE ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts(blog_posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END""",
+    'blog_posts_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_update AFTER UPDATE OF title, content ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts(blog_posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO blog_posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+}
+
+
+def create_search(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("""
+                ALTER TABLE blog_posts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(content, '')), 'B')
+                ) STORED""")
+            cursor.execute('CREATE INDEX IF NOT EXISTS blog_post_search_idx ON blog_posts USING gin (search_vector)')
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS blog_posts_fts USING fts5("
+                "title, content, content='blog_posts', content_rowid='id', tokenize='porter unicode61')"
+            )
+            for trigger in FTS_TRIGGERS.values():
+                cursor.execute(trigger)
+            cursor.execute("INSERT INTO blog_posts_fts(blog_posts_fts) VALUES ('rebuild')")
+
+
+def drop_search(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('ALTER TABLE blog_posts DROP COLUMN IF EXISTS search_vector')
+        elif connection.vendor == 'sqlite':
+            for name in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute('DROP TABLE IF EXISTS blog_posts_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.3 on 2026-10-18 13:11
+
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.lookups
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_author_team(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    User = apps.get_model('user', 'User')
+    BlogPost.objects.update(author_team_id=Subquery(User.objects.filter(pk=OuterRef('author_id')).values('team_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_comment_post_created_idx'),
+        ('user', '0010_authtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='author_team',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.SET_DEFAULT, related_name='+', to='user.team', verbose_name='Author team'),
+        ),
+        migrations.RunPython(backfill_author_team, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(django.db.models.lookups.Exact(django.db.models.expressions.CombinedExpression(models.F('access_mask'), '&', models.Value(1)), 1)), fields=['-created_at', '-id'], name='blog_post_public_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(django.db.models.lookups.Exact(django.db.models.expressions.CombinedExpression(models.F('access_mask'), '&', models.Value(4)), 4)), fields=['-created_at', '-id'], name='blog_post_auth_idx'),
+        ),
+    ]
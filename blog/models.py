@@ -1,6 +1,34 @@
-from django.db import models
+from collections import Counter
 
-from user.models import User
+from django.db import connections, models, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.lookups import Exact
+from django.utils import timezone
+
+from user.models import Team, User
+from .liked_posts import forget_liked
+
+
+EXCERPT_LENGTH = 200
+
+# Read bits of the public and authenticated categories in ``access_mask`` (see AccessMask).
+PUBLIC_READ_BIT = 1
+AUTHENTICATE_READ_BIT = 4
+
+
+def excerpt_of(html, length=EXCERPT_LENGTH):
+    """ First ``length`` characters of ``html``, cut before a tag or entity the limit falls inside. """
+    excerpt = html[:length]
+    if len(html) <= length:
+        return excerpt
+    open_tag = excerpt.rfind('<')
+    if open_tag > excerpt.rfind('>'):
+        excerpt = excerpt[:open_tag]
+    entity = excerpt.rfind('&')
+    if entity > excerpt.rfind(';') and not any(char.isspace() for char in excerpt[entity:]):
+        excerpt = excerpt[:entity]
+    return excerpt
 
 
 class BaseAbstractModel(models.Model):
@@ -17,26 +45,189 @@ class BlogPost(BaseAbstractModel):
     title = models.CharField("title", max_length=250)
     content = models.TextField("content")
     content_html = models.TextField("Html Content")
+    excerpt = models.CharField("excerpt", max_length=EXCERPT_LENGTH, blank=True, default='')
     author = models.ForeignKey(User, verbose_name="Author", on_delete=models.DO_NOTHING)
+    # Copy of author.team, so visibility filters never join users. Follows the user's
+    # team on User.save and, like it, falls back to the default team.
+    author_team = models.ForeignKey(Team, verbose_name="Author team", on_delete=models.SET_DEFAULT, default=1, related_name='+')
     likes = models.ManyToManyField(User, verbose_name=("Likes"), related_name='liked_posts', through='Like')
     comments = models.ManyToManyField(User, verbose_name=("Comments"), related_name='commented_posts', through='Comment')
+    access_mask = models.PositiveSmallIntegerField("access mask", default=0)
+    like_count = models.PositiveIntegerField("like count", default=0)
+    comment_count = models.PositiveIntegerField("comment count", default=0)
 
-    @property
-    def excerpt(self):
-        return self.content_html[:200]
+    # Maintained with targeted UPDATEs, so a stale instance must never write them back.
+    denormalized_fields = ('access_mask', 'author_team', 'like_count', 'comment_count')
 
     class Meta:
         db_table = "blog_posts"
         verbose_name = "Blog Post"
         verbose_name_plural = "Blog Posts"
+        indexes = [
+            # Every list is ordered newest first and keyset pages seek on the same pair.
+            models.Index(fields=['-created_at', '-id'], name='blog_post_created_idx'),
+            # The same order over the posts each read bit lets through: anonymous lists and the
+            # authenticated branch of the others scan them without filtering rows out.
+            models.Index(
+                fields=['-created_at', '-id'], name='blog_post_public_idx',
+                condition=Q(Exact(F('access_mask').bitand(PUBLIC_READ_BIT), PUBLIC_READ_BIT))
+            ),
+            models.Index(
+                fields=['-created_at', '-id'], name='blog_post_auth_idx',
+                condition=Q(Exact(F('access_mask').bitand(AUTHENTICATE_READ_BIT), AUTHENTICATE_READ_BIT))
+            )
+        ]
+
+    def save(self, *args, **kwargs):
+        from permission.snapshots import invalidate_post_snapshots
+
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding and self.author_id is not None:
+            self.author_team_id = self.author.team_id
+        if update_fields is None or 'content_html' in update_fields:
+            self.excerpt = excerpt_of(self.content_html)
+        if update_fields is not None and 'content_html' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        if not self._state.adding and update_fields is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.denormalized_fields
+            ]
+        super().save(*args, **kwargs)
+        invalidate_post_snapshots([self.pk])
+
+    def delete(self, *args, **kwargs):
+        from permission.snapshots import invalidate_post_snapshots
+        from permission.visibility import invalidate_mask_changes
+
+        post_id = self.pk
+        current = BlogPost.objects.filter(pk=post_id).values_list('author_team_id', 'access_mask').first()
+        deleted = super().delete(*args, **kwargs)
+        invalidate_post_snapshots([post_id])
+        if current is not None:
+            invalidate_mask_changes([(*current, 0)])
+        return deleted
 
     def __str__(self):
         return f'title: {self.title}, user: {self.author.email}'
 
-class Like(BaseAbstractModel):
+def count_of(model):
+    """ The number of ``model`` rows of each post, as an expression over BlogPost. """
+    counts = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('id')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+class PostCounterMixin:
+    """
+    Keeps the ``BlogPost`` counter named by ``counter_field`` in step with the rows
+    of the model. Bulk deletes skip it; ``reconcile_post_counters`` fixes any drift.
+    Deleting a user recounts the posts its cascade touched.
+    """
+    counter_field = None
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                self._update_counter(F(self.counter_field) + 1)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            if deleted[0]:
+                self._update_counter(Greatest(F(self.counter_field) - 1, Value(0)))
+        return deleted
+
+    def _update_counter(self, expression):
+        BlogPost.objects.filter(pk=self.post_id).update(**{self.counter_field: expression})
+
+class LikeQuerySet(models.QuerySet):
+    """ Like writes by (post, user) that skip loading rows; both keep like_count in step. """
+
+    def add(self, post_id, user_id):
+        """ Inserts the like unless it exists. Returns the new id, None if it already existed. """
+        connection = connections[self.db]
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        with transaction.atomic(using=self.db):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {self.model._meta.db_table} (post_id, user_id, created_at, updated_at) '
+                    'VALUES (%s, %s, %s, %s) ON CONFLICT (post_id, user_id) DO NOTHING RETURNING id',
+                    [post_id, user_id, now, now]
+                )
+                row = cursor.fetchone()
+            if row is not None:
+                BlogPost.objects.filter(pk=post_id).update(like_count=F('like_count') + 1)
+                forget_liked(user_id)
+        return row[0] if row is not None else None
+
+    def remove(self, post_id, user_id):
+        """ Deletes the like in one statement. Returns whether there was one. """
+        with transaction.atomic(using=self.db):
+            deleted, _ = self.filter(post_id=post_id, user_id=user_id).delete()
+            if deleted:
+                BlogPost.objects.filter(pk=post_id).update(like_count=Greatest(F('like_count') - 1, Value(0)))
+                forget_liked(user_id)
+        return bool(deleted)
+
+    def add_many(self, pairs):
+        """ Inserts the missing likes of (post id, user id) pairs in one statement. Returns the new ones per post. """
+        connection = connections[self.db]
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        rows = ', '.join(['(%s, %s, %s, %s)'] * len(pairs))
+        with transaction.atomic(using=self.db):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {self.model._meta.db_table} (post_id, user_id, created_at, updated_at) '
+                    f'VALUES {rows} ON CONFLICT (post_id, user_id) DO NOTHING RETURNING post_id',
+                    [value for post_id, user_id in pairs for value in (post_id, user_id, now, now)]
+                )
+                added = Counter(post_id for post_id, in cursor.fetchall())
+            self._shift_like_counts(added)
+        return added
+
+    def remove_many(self, pairs):
+        """ Deletes the likes of (post id, user id) pairs in one statement. Returns the removed ones per post. """
+        connection = connections[self.db]
+        rows = ', '.join(['(%s, %s)'] * len(pairs))
+        with transaction.atomic(using=self.db):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {self.model._meta.db_table} WHERE (post_id, user_id) IN (VALUES {rows}) RETURNING post_id',
+                    [value for pair in pairs for value in pair]
+                )
+                removed = Counter(post_id for post_id, in cursor.fetchall())
+            self._shift_like_counts({post_id: -count for post_id, count in removed.items()})
+        return removed
+
+    @staticmethod
+    def _shift_like_counts(deltas):
+        """ Moves like_count by {post id: delta}, with one UPDATE per distinct delta. """
+        posts_by_delta = {}
+        for post_id, delta in deltas.items():
+            posts_by_delta.setdefault(delta, []).append(post_id)
+        for delta, post_ids in posts_by_delta.items():
+            BlogPost.objects.filter(pk__in=post_ids).update(like_count=Greatest(F('like_count') + delta, Value(0)))
+
+
+class Like(PostCounterMixin, BaseAbstractModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(BlogPost, on_delete=models.CASCADE)
 
+    counter_field = 'like_count'
+
+    objects = LikeQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        forget_liked(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        forget_liked(self.user_id)
+        return deleted
+
     class Meta:
         db_table = 'blog_post_likes'
         constraints = [
@@ -46,13 +237,24 @@ class Like(BaseAbstractModel):
     def __str__(self) -> str:
         return self.post.__str__()
     
-class Comment(BaseAbstractModel):
+class Comment(PostCounterMixin, BaseAbstractModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(BlogPost, on_delete=models.CASCADE)
     comment = models.TextField(("comment"))
 
+    counter_field = 'comment_count'
+
     class Meta:
         db_table = 'blog_post_comments'
+        indexes = [
+            models.Index(fields=['post', 'user'], name='comment_post_user_idx'),
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx')
+        ]
 
     def __str__(self) -> str:
-        return f'{self.post.__str__()}, comment: {self.comment}'
\ No newline at end of file
+        return f'{self.post.__str__()}, comment: {self.comment}'
+
+
+def recount_post_counters(post_ids):
+    """ Recomputes like_count and comment_count of the posts from their rows. Returns the posts updated. """
+    return BlogPost.objects.filter(pk__in=post_ids).update(like_count=count_of(Like), comment_count=count_of(Comment))
@@ -0,0 +1,72 @@
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# PostgreSQL keeps a weighted tsvector as a generated column behind a GIN index.
+# SQLite keeps an external content FTS5 table in step with triggers. Both are created
+# by migration 0014; the triggers are repeated here to restore them after migrations.
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'blog_posts_fts'
+FTS_TRIGGERS = {
+    'blog_posts_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_insert AFTER INSERT ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+    'blog_posts_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_delete AFTER DELETE ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts(blog_posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END""",
+    'blog_posts_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS blog_posts_fts_update AFTER UPDATE OF title, content ON blog_posts BEGIN
+            INSERT INTO blog_posts_fts(blog_posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO blog_posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+}
+
+
+def restore_search_triggers(connection):
+    """
+    Recreates the SQLite FTS triggers a migration dropped by rebuilding blog_posts and
+    resyncs the index. The search structures themselves come from migration 0014.
+    """
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'blog_posts'")
+        missing = FTS_TRIGGERS.keys() - {name for name, in cursor.fetchall()}
+        if missing:
+            for name in missing:
+                cursor.execute(FTS_TRIGGERS[name])
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def fts_query(terms):
+    """ Quotes every word so FTS5 reads user input as plain terms, all of them required. """
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in terms.split())
+
+
+def search_posts(queryset, terms):
+    """
+    Narrows ``queryset`` to the posts matching every word of ``terms`` in the title or
+    content and annotates a ``search_rank`` where higher is better. Databases without
+    a full text index fall back to unranked substring matches.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        query = f"plainto_tsquery('{SEARCH_CONFIG}', %s)"
+        matches = RawSQL(f'blog_posts.search_vector @@ {query}', [terms], output_field=BooleanField())
+        rank = RawSQL(f'ts_rank(blog_posts.search_vector, {query})', [terms], output_field=FloatField())
+    elif vendor == 'sqlite':
+        # bm25() is lower for better matches and only valid inside the FTS query itself.
+        matches = RawSQL(f'blog_posts.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)', [fts_query(terms)], output_field=BooleanField())
+        rank = RawSQL(
+            f'(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = blog_posts.id)',
+            [fts_query(terms)], output_field=FloatField()
+        )
+    else:
+        # No full text index here: every word must appear in the title or content, unranked.
+        matches = Q()
+        for word in terms.split():
+            matches &= Q(title__icontains=word) | Q(content__icontains=word)
+        rank = Value(0.0, output_field=FloatField())
+    return queryset.filter(matches).annotate(search_rank=rank)
@@ -1,14 +1,26 @@
+from django.core.cache import caches
 from django.urls import reverse
 from rest_framework.test import APITestCase
 
 from permission.models import Category, Permission, CategoryName, PermissionName
 from user.tests.factories.user_factories import TeamFactory, UserFactory
+from permission.snapshots import post_snapshots
+from ..like_buffer import like_buffer
 from .factories.blog_post_factories import BlogPostFactory
 
 
+def clear_caches():
+    # Test rollbacks reuse ids, so cached rows from other tests must not survive.
+    for cache in caches.all():
+        cache.clear()
+    post_snapshots.clear()
+    like_buffer.clear()
+
+
 class AuthenticateSetUp(APITestCase):
 
         def setUp(self):
+            clear_caches()
             login_url = reverse('login')
             self.post_url = '/post/'
             self.like_url = '/like/'
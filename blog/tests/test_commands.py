@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError
+from django.test import TestCase
+
+from permission.models import Category, CategoryName, Permission, PermissionName, PostPermission
+from user.tests.factories.user_factories import UserFactory
+from ..importer import PostImporter, csv_rows
+from ..models import BlogPost, Like
+from .factories.blog_post_factories import BlogPostFactory, CommentFactory, LikeFactory
+
+
+class ReconcilePostCountersTest(TestCase):
+
+    def test_reconcile_fixes_drifted_counters(self):
+        post = BlogPostFactory()
+        post2 = BlogPostFactory()
+        LikeFactory.create_batch(2, post=post)
+        CommentFactory(post=post2)
+        Like.objects.filter(post=post).delete()
+        BlogPost.objects.filter(pk=post2.id).update(like_count=5)
+
+        out = StringIO()
+        call_command('reconcile_post_counters', batch_size=1, stdout=out)
+
+        post.refresh_from_db()
+        post2.refresh_from_db()
+        self.assertEqual((post.like_count, post.comment_count), (0, 0))
+        self.assertEqual((post2.like_count, post2.comment_count), (0, 1))
+        self.assertIn('Checked 2 posts, fixed counters on 2.', out.getvalue())
+
+
+class ImportPostsTest(TestCase):
+
+    def setUp(self):
+        read = Permission.objects.create(name=PermissionName.READ)
+        self.permissions = [
+            {'category_id': Category.objects.create(name=name).id, 'permission_id': read.id} for name in CategoryName
+        ]
+
+    def csv_line(self, title, author, permissions):
+        return f'{title},c,<p>c</p>,{author},"' + json.dumps(permissions).replace('"', '""') + '"\r\n'
+
+    def test_import_posts_from_ndjson_file(self):
+        author = UserFactory()
+        permissions = self.permissions
+        rows = [
+            {'title': 'One', 'content': 'c', 'content_html': '<p>c</p>', 'permissions': permissions},
+            {'title': 'Two', 'content': 'c', 'content_html': '<p>c</p>', 'permissions': permissions[:2]},
+            {'title': 'Three', 'content': 'c', 'content_html': '<p>c</p>', 'permissions': permissions, 'author': -1},
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as file:
+            file.write('\n'.join(json.dumps(row) for row in rows))
+        self.addCleanup(os.remove, file.name)
+
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', file.name, author=author.email, batch_size=2, stdout=out, stderr=err)
+
+        self.assertEqual(list(BlogPost.objects.values_list('title', flat=True)), ['One'])
+        self.assertEqual(PostPermission.objects.count(), 4)
+        self.assertIn('Imported 1 posts, 2 rows failed.', out.getvalue())
+        self.assertIn('line 2:', err.getvalue())
+        self.assertIn('line 3:', err.getvalue())
+
+    def test_import_posts_rejects_non_positive_batch_size(self):
+        for batch_size in (0, -1):
+            with self.subTest(batch_size=batch_size):
+                with self.assertRaisesMessage(CommandError, '--batch-size must be a positive integer.'):
+                    call_command('import_posts', '-', batch_size=batch_size)
+                with self.assertRaises(ValueError):
+                    PostImporter(batch_size=batch_size)
+
+    def test_import_posts_reads_row_authors_from_csv(self):
+        author = UserFactory()
+        body = 'title,content,content_html,author,permissions\r\n' + ''.join([
+            self.csv_line('One', author.id, self.permissions),
+            self.csv_line('Two', 'abc', self.permissions),
+            self.csv_line('Three', author.id, [*self.permissions, self.permissions[0]]),
+            self.csv_line('Four', '', self.permissions),
+        ])
+        result = PostImporter(allow_row_author=True).run(csv_rows(body.splitlines(keepends=True)))
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(BlogPost.objects.values_list('author_id', 'author_team_id').get(), (author.id, author.team_id))
+        errors = {error['line']: error['errors'] for error in result['errors']}
+        self.assertEqual(set(errors), {2, 3, 4})
+        self.assertIn('author', errors[2])
+        self.assertIn('permissions', errors[3])
+        self.assertIn('author', errors[4])
+
+    def test_import_posts_isolates_rows_a_batch_write_rejects(self):
+        author = UserFactory()
+        rows = [
+            {'title': title, 'content': 'c', 'content_html': '<p>c</p>', 'permissions': self.permissions}
+            for title in ('One', 'Bad', 'Three')
+        ]
+        write = PostImporter.write
+
+        def failing_write(entries, teams):
+            if any(data['title'] == 'Bad' for _, _, data in entries):
+                raise DatabaseError('rejected')
+            return write(entries, teams)
+
+        with mock.patch.object(PostImporter, 'write', side_effect=failing_write):
+            result = PostImporter(author.id).run(rows)
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['errors'], [{'line': 2, 'errors': {'non_field_errors': ['rejected']}}])
+        self.assertEqual(set(BlogPost.objects.values_list('title', flat=True)), {'One', 'Three'})
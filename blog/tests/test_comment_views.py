@@ -1,3 +1,7 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.status import *
 
@@ -293,3 +297,54 @@ class BlogPostWithAuthenticationTest(AuthenticateSetUp):
         self.assertEqual(response.data['next'][next_page_param:], '?page=2')
         self.assertEqual(response.data['previous'], None)
         self.assertEqual(len(response.data['results']), 5)
+
+
+    def test_view_post_comments_feed(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        comments = CommentFactory.create_batch(7, post=self.post_author, user=self.user)
+        CommentFactory(post=self.post_team, user=self.user)
+        feed_url = f'{self.post_url}{self.post_author.id}/comments/'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(feed_url)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        comment_queries = [query['sql'] for query in queries.captured_queries if 'blog_post_comments' in query['sql']]
+        self.assertEqual(len(comment_queries), 1)
+        self.assertNotIn('blog_posts', comment_queries[0])
+        self.assertEqual(response.data['previous'], None)
+        next_page = self.client.get(response.data['next'])
+        ids = [comment['id'] for comment in response.data['results'] + next_page.data['results']]
+        self.assertEqual(ids, sorted((comment.id for comment in comments), reverse=True))
+        self.assertEqual(response.data['results'][0]['post'], {'id': self.post_author.id, 'title': self.post_author.title})
+        self.assertIsNone(next_page.data['next'])
+
+
+    def test_view_post_comments_feed_checks_read_access(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_team, permission=self.none)
+        CommentFactory(post=self.post_team, user=self.user)
+        response = self.client.get(f'{self.post_url}{self.post_team.id}/comments/')
+        self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'error': 'Cannot access to this post.'})
+        response = self.client.get(f'{self.post_url}9999/comments/')
+        self.assertEqual(response.data, {'error': 'Post not found.'})
+
+
+    def test_view_post_comments_stream_ndjson(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        comments = CommentFactory.create_batch(12, post=self.post_author, user=self.user)
+        response = self.client.get(f'{self.post_url}{self.post_author.id}/comments/', {'format': 'ndjson'})
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], sorted((comment.id for comment in comments), reverse=True))
+
+
+    def test_view_comment_list_query_count_is_fixed_per_page(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        CommentFactory.create_batch(2, post=self.post_author)
+        self.client.get(self.comment_url)
+        # Session, user, the count and the page itself.
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.client.get(self.comment_url).data['results']), 2)
+        CommentFactory.create_batch(6, post=self.post_author)
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.client.get(self.comment_url).data['results']), 5)
@@ -0,0 +1,44 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from ..models import BlogPost, Comment, Like
+from permission.models import PostPermission
+
+
+class IndexPlanTest(TestCase):
+    """ The hot list and filter queries are planned on the composite indexes. """
+
+    def plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Test tables are tiny, so the planner would pick a seq scan anyway.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_post_list_order_uses_created_index(self):
+        plan = self.plan(BlogPost.objects.order_by('-created_at', '-id')[:10])
+        self.assertIn('blog_post_created_idx', plan)
+
+    def test_like_filter_uses_post_user_constraint(self):
+        plan = self.plan(Like.objects.filter(post_id=1, user_id=1))
+        # SQLite names the index behind a table level unique constraint itself.
+        self.assertRegex(plan, 'unique_post_user|sqlite_autoindex_blog_post_likes')
+
+    def test_comment_filter_uses_post_user_index(self):
+        plan = self.plan(Comment.objects.filter(post_id=1, user_id=1))
+        self.assertIn('comment_post_user_idx', plan)
+
+    def test_post_comment_feed_uses_created_index(self):
+        plan = self.plan(Comment.objects.filter(post_id=1).order_by('-created_at', '-id')[:6])
+        self.assertIn('comment_post_created_idx', plan)
+
+    def test_post_permissions_use_covering_index(self):
+        plan = self.plan(PostPermission.objects.filter(post_id=1).values_list('category_id', 'permission_id'))
+        self.assertIn('post_category_permission_idx', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', 'trigram indexes need PostgreSQL')
+    def test_title_filter_uses_trigram_index(self):
+        plan = self.plan(BlogPost.objects.filter(title__icontains='post'))
+        self.assertIn('blog_post_title_trgm_idx', plan)
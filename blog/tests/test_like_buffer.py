@@ -0,0 +1,113 @@
+import os
+import runpy
+import threading
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from rest_framework.status import *
+
+from permission.tests.factories.permission_factories import PostWithPermissionFactory
+from user.tests.factories.user_factories import UserFactory
+from .setup import AuthenticateSetUp
+from ..like_buffer import LikeBuffer, like_buffer
+from ..models import BlogPost, Like
+
+
+@override_settings(LIKE_WRITE_MODE='buffered', LIKE_BUFFER_INTERVAL=0)
+class LikeBufferTest(AuthenticateSetUp):
+
+    def setUp(self):
+        super().setUp()
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        self.detail_url = f'{self.post_url}{self.post_author.id}/'
+
+    def test_intents_are_acknowledged_and_collapsed(self):
+        response = self.client.post(self.like_url, {'post_id': self.post_author.id}, format='json')
+        self.assertEqual(response.status_code, HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {'post_id': self.post_author.id, 'liked': True})
+        self.client.delete(f'{self.like_url}{self.post_author.id}/')
+        self.client.post(self.like_url, {'post_id': self.post_author.id}, format='json')
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(len(like_buffer), 1)
+        self.assertEqual(like_buffer.flush(), 1)
+        self.assertEqual(Like.objects.filter(post=self.post_author, user=self.user).count(), 1)
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 1)
+
+    def test_acting_user_reads_own_pending_likes(self):
+        self.client.post(self.like_url, {'post_id': self.post_author.id}, format='json')
+        detail = self.client.get(self.detail_url).data
+        self.assertEqual((detail['post_liked'], detail['likes']), (True, 1))
+        item = self.client.get(self.post_url).data['results'][0]
+        self.assertEqual((item['post_liked'], item['likes']), (True, 1))
+        like_buffer.flush()
+        response = self.client.post(f'{self.like_url}toggle/', {'post_id': self.post_author.id}, format='json')
+        self.assertEqual(response.data, {'post_id': self.post_author.id, 'liked': False})
+        detail = self.client.get(self.detail_url).data
+        self.assertEqual((detail['post_liked'], detail['likes']), (False, 0))
+        like_buffer.flush()
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 0)
+
+    def test_permissions_are_checked_before_buffering(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_team, permission=self.none)
+        response = self.client.post(self.like_url, {'post_id': self.post_team.id}, format='json')
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+        self.assertEqual(len(like_buffer), 0)
+
+    @override_settings(LIKE_BUFFER_BATCH_SIZE=2)
+    def test_flush_writes_in_batches_and_drops_deleted_posts(self):
+        users = UserFactory.create_batch(3)
+        for user in users:
+            like_buffer.record(self.post_author.id, user.id, True)
+        like_buffer.record(self.post_team.id, users[0].id, True)
+        self.post_team.delete()
+        self.assertEqual(like_buffer.flush(), 4)
+        self.assertEqual(Like.objects.count(), 3)
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 3)
+        self.assertEqual(len(like_buffer), 0)
+
+    @override_settings(LIKE_BUFFER_MAX_SIZE=1)
+    def test_full_buffer_falls_back_to_direct_writes(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_team, permission=self.read)
+        self.client.post(self.like_url, {'post_id': self.post_author.id}, format='json')
+        response = self.client.post(self.like_url, {'post_id': self.post_team.id}, format='json')
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(list(Like.objects.values_list('post_id', flat=True)), [self.post_team.id])
+        response = self.client.delete(f'{self.like_url}{self.post_author.id}/')
+        self.assertEqual(response.status_code, HTTP_202_ACCEPTED)
+        self.assertEqual(len(like_buffer), 1)
+        response = self.client.post(f'{self.like_url}toggle/', {'post_id': self.post_team.id}, format='json')
+        self.assertEqual(response.data, {'post_id': self.post_team.id, 'liked': False})
+        self.assertFalse(Like.objects.exists())
+
+    def test_worker_survives_a_failed_flush(self):
+        buffer = LikeBuffer()
+        # SystemExit ends the thread once the failure has been survived.
+        with mock.patch.object(buffer, 'flush', side_effect=[RuntimeError('boom'), SystemExit]) as flush:
+            with self.assertLogs('blog.like_buffer', 'ERROR'):
+                worker = threading.Thread(target=buffer._run, args=(0.01,))
+                worker.start()
+                worker.join(5)
+        self.assertEqual(flush.call_count, 2)
+
+    def test_flush_moves_counts_by_the_rows_written(self):
+        users = UserFactory.create_batch(3)
+        Like.objects.add(self.post_author.id, users[0].id)
+        # A drifted counter stays off by the same amount: flushes apply deltas, never recount.
+        BlogPost.objects.filter(pk=self.post_author.id).update(like_count=10)
+        like_buffer.record(self.post_author.id, users[0].id, True)
+        like_buffer.record(self.post_author.id, users[1].id, True)
+        like_buffer.record(self.post_author.id, users[2].id, False)
+        like_buffer.flush()
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 11)
+        like_buffer.record(self.post_author.id, users[0].id, False)
+        like_buffer.record(self.post_author.id, users[1].id, False)
+        like_buffer.flush()
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 9)
+        self.assertFalse(Like.objects.exists())
+
+    def test_settings_refuse_buffering_without_an_interval(self):
+        with mock.patch.dict(os.environ, {'LIKE_WRITE_MODE': 'buffered', 'LIKE_BUFFER_INTERVAL': '0'}):
+            with self.assertRaises(ImproperlyConfigured):
+                runpy.run_module('avanzatech_blog.settings.base')
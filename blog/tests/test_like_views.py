@@ -1,11 +1,17 @@
+from django.db import connection
+from unittest import mock
+
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.status import *
 
+from blog import liked_posts
 from blog.tests.factories.blog_post_factories import LikeFactory
 from permission.models import PostPermission
 
 from .setup import AuthenticateSetUp
-from ..models import Like
+from ..models import BlogPost, Like
 from permission.tests.factories.permission_factories import PostWithPermissionFactory
 
 
@@ -262,3 +268,115 @@ class BlogPostWithAuthenticationTest(AuthenticateSetUp):
 
     
 
+
+
+    def test_view_cursor_pagination(self):
+        admin = self.user
+        admin.is_admin = True
+        admin.save()
+        LikeFactory.create_batch(20)
+        response = self.client.get(f'{self.like_url}?pagination=cursor')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 15)
+        next_page = self.client.get(response.data['next'])
+        self.assertEqual(len(next_page.data['results']), 5)
+        self.assertEqual(next_page.data['next'], None)
+        ids = [like['id'] for like in response.data['results'] + next_page.data['results']]
+        self.assertEqual(len(set(ids)), 20)
+
+
+    def test_view_like_and_unlike_write_with_two_statements(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        self.client.get(f'{self.post_url}{self.post_author.id}/')
+        with CaptureQueriesContext(connection) as created:
+            response = self.client.post(self.like_url, {'post_id': self.post_author.id}, format='json')
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        self.assertEqual(response.data['post'], {'id': self.post_author.id, 'title': self.post_author.title})
+        self.assertEqual(response.data['user']['email'], self.user.email)
+        with CaptureQueriesContext(connection) as deleted:
+            response = self.client.delete(f'{self.like_url}{self.post_author.id}/')
+        self.assertEqual(response.status_code, HTTP_204_NO_CONTENT)
+        for queries in (created, deleted):
+            writes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE', 'SELECT "blog'))]
+            self.assertEqual(len(writes), 2, writes)
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 0)
+
+
+    def test_view_toggle_like(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        toggle_url = f'{self.like_url}toggle/'
+        response = self.client.post(toggle_url, {'post_id': self.post_author.id}, format='json')
+        self.assertEqual(response.data, {'post_id': self.post_author.id, 'liked': True})
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 1)
+        response = self.client.post(toggle_url, {'post_id': self.post_author.id}, format='json')
+        self.assertEqual(response.data, {'post_id': self.post_author.id, 'liked': False})
+        self.assertEqual(BlogPost.objects.get(pk=self.post_author.id).like_count, 0)
+        self.assertFalse(Like.objects.exists())
+
+        PostPermission.objects.filter(post=self.post_author).update(permission=self.none)
+        response = self.client.post(toggle_url, {'post_id': self.post_author.id}, format='json')
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+        self.client.logout()
+        response = self.client.post(toggle_url, {'post_id': self.post_author.id}, format='json')
+        self.assertEqual(response.status_code, HTTP_403_FORBIDDEN)
+
+
+    def test_view_like_status(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        PostWithPermissionFactory.create_batch(4, post=self.post_team, permission=self.read)
+        PostWithPermissionFactory.create_batch(4, post=self.post_authenticate, permission=self.none)
+        status_url = f'{self.like_url}status/'
+        post_ids = f'{self.post_author.id},{self.post_team.id},{self.post_authenticate.id},9999'
+        self.client.post(self.like_url, {'post_id': self.post_author.id}, format='json')
+        response = self.client.get(status_url, {'post_ids': post_ids})
+        self.assertEqual(response.data, {self.post_author.id: True, self.post_team.id: False})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(status_url, {'post_ids': post_ids})
+        self.assertFalse([query for query in queries.captured_queries if 'blog_post_likes' in query['sql']])
+        self.client.delete(f'{self.like_url}{self.post_author.id}/')
+        self.client.post(self.like_url, {'post_id': self.post_team.id}, format='json')
+        response = self.client.get(status_url, {'post_ids': post_ids})
+        self.assertEqual(response.data, {self.post_author.id: False, self.post_team.id: True})
+        liked = {post['id']: post['post_liked'] for post in self.client.get(self.post_url).data['results']}
+        self.assertEqual(liked, {self.post_author.id: False, self.post_team.id: True})
+
+
+    def test_like_written_during_a_cache_fill_is_not_hidden(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        status_url = f'{self.like_url}status/'
+        load_liked = liked_posts.load_liked
+
+        def read_then_like(user_id, post_ids):
+            # The fill reads "not liked", then a like commits before the fill is stored.
+            stale = load_liked(user_id, post_ids)
+            Like.objects.add(self.post_author.id, user_id)
+            return stale
+
+        with mock.patch('blog.liked_posts.load_liked', side_effect=read_then_like):
+            response = self.client.get(status_url, {'post_ids': self.post_author.id})
+        self.assertEqual(response.data, {self.post_author.id: False})
+        response = self.client.get(status_url, {'post_ids': self.post_author.id})
+        self.assertEqual(response.data, {self.post_author.id: True})
+
+
+    @override_settings(LIKE_STATUS_MAX_POSTS=2)
+    def test_view_like_status_rejects_bad_post_ids(self):
+        status_url = f'{self.like_url}status/'
+        for post_ids in ('', '1,a', '1,2,3'):
+            response = self.client.get(status_url, {'post_ids': post_ids})
+            self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+            self.assertIn('post_ids', response.data)
+        self.client.logout()
+        self.assertEqual(self.client.get(status_url, {'post_ids': '1'}).status_code, HTTP_403_FORBIDDEN)
+
+
+    def test_view_like_list_query_count_is_fixed_per_page(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        LikeFactory.create_batch(2, post=self.post_author)
+        self.client.get(self.like_url)
+        # Session, user, the count and the page itself.
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.client.get(self.like_url).data['results']), 2)
+        LikeFactory.create_batch(16, post=self.post_author)
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.client.get(self.like_url).data['results']), 15)
@@ -2,7 +2,7 @@ from datetime import datetime
 from django.test import TestCase
 from django.db import IntegrityError
 
-from ..models import BlogPost, Like, Comment
+from ..models import BlogPost, Like, Comment, excerpt_of
 from .factories.blog_post_factories import *
 
 class BlogModelTest(TestCase):
@@ -32,6 +32,17 @@ class BlogModelTest(TestCase):
             blog_post = BlogPost()
             blog_post.save()
 
+    def test_excerpt_is_not_cut_inside_tags_or_entities(self):
+        self.assertEqual(excerpt_of('<p>Some text</p>', 14), '<p>Some text')
+        self.assertEqual(excerpt_of('<p>Fish &amp; chips</p>', 12), '<p>Fish ')
+        self.assertEqual(excerpt_of('<p>Short</p>', 200), '<p>Short</p>')
+
+    def test_excerpt_is_stored_and_follows_content_updates(self):
+        blog_post = BlogPostFactory(content_html='<p>First</p>')
+        blog_post.content_html = '<p>Second</p>'
+        blog_post.save(update_fields=['content_html'])
+        self.assertEqual(BlogPost.objects.get(pk=blog_post.pk).excerpt, '<p>Second</p>')
+
 class LikeModelTest(TestCase):
 
     def test_like_exist(self):
@@ -62,6 +73,17 @@ class LikeModelTest(TestCase):
             like2 = Like(user=user, post=post)
             like2.save()
 
+    def test_like_count_follows_likes(self):
+        post = BlogPostFactory()
+        like = LikeFactory(post=post)
+        LikeFactory(post=post)
+        post.refresh_from_db()
+        self.assertEqual(post.like_count, 2)
+
+        like.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.like_count, 1)
+
     def test_delete_likes_when_user_deleted(self):
         user = UserFactory()
         user2 = UserFactory()
@@ -80,6 +102,18 @@ class LikeModelTest(TestCase):
         self.assertEqual(len(likes_from_db), 0)
         self.assertEqual(len(likes_other_user), 1)
 
+    def test_user_delete_recounts_the_posts_it_touched(self):
+        user = UserFactory()
+        user2 = UserFactory()
+        post = BlogPostFactory()
+        Like.objects.create(user=user, post=post)
+        Like.objects.create(user=user2, post=post)
+        Comment.objects.create(user=user, post=post, comment='first')
+
+        user.delete()
+        post.refresh_from_db()
+        self.assertEqual((post.like_count, post.comment_count), (1, 0))
+
     def test_delete_likes_when_post_deleted(self):
         user = UserFactory()
         user2 = UserFactory()
@@ -121,6 +155,24 @@ class CommentModelTest(TestCase):
         self.assertEqual(comment_created.created_at.date(), comment_created.updated_at.date())
         self.assertEqual(comment_created.created_at.date(), created_date)
 
+    def test_comment_count_follows_comments(self):
+        post = PostWith2CommentsFactory()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 2)
+
+        post.comment_set.first().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
+    def test_deleting_a_stale_comment_keeps_the_count(self):
+        post = PostWith2CommentsFactory()
+        comment = post.comment_set.first()
+        stale = Comment.objects.get(pk=comment.pk)
+        comment.delete()
+        stale.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
     def test_delete_comments_when_user_deleted(self):
         user = UserWith2CommentsFactory()
         user2 = UserWith2CommentsFactory()
@@ -1,3 +1,4 @@
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from rest_framework.status import *
 
@@ -7,12 +8,14 @@ from permission.tests.factories.permission_factories import PostWithPermissionFa
 from user.tests.factories.user_factories import TeamFactory, UserFactory
 from ..models import BlogPost, Like, Comment
 from user.models import User
+from .setup import clear_caches
 
 
 class BlogPostWithNoAuthTest(APITestCase):
 
 
     def setUp(self):
+        clear_caches()
         self.post_url = '/post/'
         self.user = User.objects.create_user(email="admin2@mail.com", password="223344")
         self.public = Category.objects.create(name=CategoryName.PUBLIC)
@@ -80,6 +83,25 @@ class BlogPostWithNoAuthTest(APITestCase):
         self.assertEqual(len(response.data['results']), 1)
 
 
+    @override_settings(VISIBLE_POSTS_CACHE_SIZE=12)
+    def test_anonymous_list_is_paged_from_the_shared_window(self):
+        posts = BlogPostFactory.create_batch(15, author=self.user)
+        for post in posts:
+            PostWithPermissionFactory.create_batch(4, post=post, permission=self.read)
+        PostPermission.objects.filter(post=posts[0], category=self.public).update(permission=self.none)
+        newest_first = [post.id for post in reversed(posts[1:])]
+
+        self.assertEqual([post['id'] for post in self.client.get(self.post_url).data['results']], newest_first[:10])
+        with self.assertNumQueries(1):
+            response = self.client.get(self.post_url)
+        self.assertEqual(response.data['total_count'], 14)
+        self.assertEqual(response.data['total_pages'], 2)
+        # Page 2 runs past the 12 cached ids, so it is read the usual way.
+        response = self.client.get(f'{self.post_url}?page=2')
+        self.assertEqual([post['id'] for post in response.data['results']], newest_first[10:])
+        self.assertEqual(len(self.client.get(self.post_url, {'title': posts[1].title}).data['results']), 1)
+
+
     def test_view_shows_404_when_retrieve_no_public_and_no_auth_user(self):
         self.assertFalse(self.user.is_admin)
         post_author = BlogPostFactory(author=self.user)
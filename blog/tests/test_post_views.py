@@ -1,12 +1,18 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.response import Response
 from rest_framework.status import *
 
 from .setup import AuthenticateSetUp
+from caching.counting_cache import list_counts
 from ..models import BlogPost
 from permission.models import PostPermission
-from .factories.blog_post_factories import BlogPostFactory
+from .factories.blog_post_factories import BlogPostFactory, CommentFactory, LikeFactory
 from permission.tests.factories.permission_factories import PostWithPermissionFactory
+from user.tests.factories.user_factories import TeamFactory
 
 
 class BlogPostWithAuthenticationTest(AuthenticateSetUp):
@@ -35,6 +41,16 @@ class BlogPostWithAuthenticationTest(AuthenticateSetUp):
         self.assertTrue(all(permission.category in categories for permission in permissions))
 
 
+    def test_view_writes_all_permissions_in_one_statement(self):
+        self.client.get('/permission/category/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.post_url, self.data, format='json')
+        self.assertEqual(response.status_code, HTTP_201_CREATED)
+        permission_writes = [query for query in queries.captured_queries if 'INSERT INTO "post_category_permissions"' in query['sql']]
+        self.assertEqual(len(permission_writes), 1)
+        self.assertEqual(PostPermission.objects.filter(post_id=response.data['id']).count(), 4)
+
+
     def test_view_can_handle_post_with_missing_fields(self):
         test_data = [
             {**self.data, 'title': None},
@@ -106,6 +122,18 @@ class BlogPostWithAuthenticationTest(AuthenticateSetUp):
         self.assertEqual(response.data['permissions'][0], "Missing permission for some category.")
 
 
+    def test_view_rejects_repeated_category_among_all_categories(self):
+        data = {**self.data, 'permissions': [
+                        *self.data['permissions'],
+                        {'category_id': self.public.id, 'permission_id': self.edit.id}
+                    ]
+                }
+        response: Response = self.client.post(self.post_url, data, format='json')
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['permissions'][0], "Each category must have a single permission.")
+        self.assertFalse(BlogPost.objects.filter(title=data['title']).exists())
+
+
     def test_view_updates_post_data_including_permissions(self):
         post = BlogPostFactory(author=self.user)
         PostWithPermissionFactory(post=post, category=self.public, permission=self.read)
@@ -463,4 +491,173 @@ class BlogPostWithAuthenticationTest(AuthenticateSetUp):
         self.assertEqual(response.data['previous'], None)
         self.assertEqual(len(response.data['results']), 10)
 
-    
+
+    def test_view_shows_likes_comments_and_liked_flag(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        LikeFactory(post=self.post_author, user=self.user)
+        LikeFactory(post=self.post_author)
+        CommentFactory.create_batch(3, post=self.post_author)
+        response = self.client.get(self.post_url)
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['likes'], 2)
+        self.assertEqual(response.data['results'][0]['comments'], 3)
+        self.assertTrue(response.data['results'][0]['post_liked'])
+
+        response = self.client.get(f'{self.post_url}{self.post_author.id}/')
+        self.assertEqual(response.data['likes'], 2)
+        self.assertEqual(response.data['comments'], 3)
+        self.assertTrue(response.data['post_liked'])
+
+
+    def test_view_list_shows_excerpt_without_post_body(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        post = self.client.get(self.post_url).data['results'][0]
+        self.assertEqual(post['excerpt'], self.post_author.excerpt)
+        self.assertNotIn('content', post)
+        self.assertNotIn('content_html', post)
+
+        post = self.client.get(f'{self.post_url}{self.post_author.id}/').data
+        self.assertEqual(post['content_html'], self.post_author.content_html)
+
+
+    def test_view_cached_bodies_follow_author_edits(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_team, permission=self.read)
+        detail_url = f'{self.post_url}{self.post_team.id}/'
+        self.client.get(self.post_url)
+        self.client.get(detail_url)
+        author = self.post_team.author
+        author.email = 'renamed@mail.com'
+        author.team = TeamFactory(name='new team')
+        author.save()
+        for post in (self.client.get(self.post_url).data['results'][0], self.client.get(detail_url).data):
+            self.assertEqual(post['author']['email'], 'renamed@mail.com')
+            self.assertEqual(post['author']['team'], {'id': author.team.id, 'name': 'new team'})
+
+
+    def test_view_list_honours_sparse_fieldsets(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        with CaptureQueriesContext(connection) as sparse:
+            response = self.client.get(f'{self.post_url}?fields=id,title,likes')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data['results'][0], {'id': self.post_author.id, 'title': self.post_author.title, 'likes': 0})
+        queries = ' '.join(query['sql'] for query in sparse.captured_queries)
+        self.assertNotIn('post_category_permissions', queries)
+        self.assertNotIn('"excerpt"', queries)
+
+        response = self.client.get(f'{self.post_url}?fields=id,content')
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+
+
+    def test_view_list_query_count_does_not_depend_on_page_size(self):
+        admin = self.user
+        admin.is_admin = True
+        admin.save()
+        for post in BlogPost.objects.all():
+            LikeFactory(post=post)
+            CommentFactory(post=post)
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(self.post_url)
+        self.assertEqual(len(response.data['results']), 3)
+
+        for post in BlogPostFactory.create_batch(7):
+            LikeFactory(post=post)
+            CommentFactory(post=post)
+        with CaptureQueriesContext(connection) as full_page:
+            response = self.client.get(self.post_url)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(full_page.captured_queries), len(small_page.captured_queries))
+
+
+    def test_view_cursor_pagination_walks_all_pages_both_ways(self):
+        admin = self.user
+        admin.is_admin = True
+        admin.save()
+        BlogPostFactory.create_batch(22)
+        expected = list(BlogPost.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        response = self.client.get(f'{self.post_url}?pagination=cursor')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertNotIn('total_count', response.data)
+        self.assertEqual(response.data['previous'], None)
+        pages = [response.data]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).data)
+        self.assertEqual([len(page['results']) for page in pages], [10, 10, 5])
+        self.assertEqual([post['id'] for page in pages for post in page['results']], expected)
+
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(previous['results'], pages[1]['results'])
+        first = self.client.get(previous['previous']).data
+        self.assertEqual(first['results'], pages[0]['results'])
+        self.assertEqual(first['previous'], None)
+
+
+    def test_view_cursor_pagination_rejects_invalid_cursor(self):
+        response = self.client.get(f'{self.post_url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, HTTP_404_NOT_FOUND)
+
+
+    def test_view_pagination_can_skip_total_count(self):
+        admin = self.user
+        admin.is_admin = True
+        admin.save()
+        BlogPostFactory.create_batch(17)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.post_url}?count=false&page=2')
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        self.assertEqual(response.data['total_count'], None)
+        self.assertEqual(response.data['current_page'], 2)
+        self.assertEqual(response.data['next'], None)
+        self.assertTrue(response.data['previous'].endswith('?count=false'))
+        self.assertEqual(len(response.data['results']), 10)
+
+
+    def test_view_pagination_caches_total_count(self):
+        admin = self.user
+        admin.is_admin = True
+        admin.save()
+        list_counts.clear()
+        with self.settings(PAGINATION_COUNT_STRATEGY='cached'):
+            self.assertEqual(self.client.get(self.post_url).data['total_count'], 3)
+            BlogPostFactory()
+            self.assertEqual(self.client.get(self.post_url).data['total_count'], 3)
+            self.assertEqual(self.client.get(f'{self.post_url}?title=zzz').data['total_count'], 0)
+        self.assertEqual(self.client.get(self.post_url).data['total_count'], 4)
+
+
+    def test_view_bulk_imports_ndjson_and_reports_row_errors(self):
+        rows = [
+            json.dumps(self.data),
+            '{not json',
+            json.dumps({**self.data, 'title': ''}),
+            json.dumps({**self.data, 'title': 'Second'}),
+        ]
+        response = self.client.post(
+            f'{self.post_url}bulk/?batch_size=1', '\n'.join(rows), content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3])
+        imported = BlogPost.objects.filter(title__in=[self.data['title'], 'Second'], author=self.user)
+        self.assertEqual(imported.count(), 2)
+        self.assertEqual(PostPermission.objects.filter(post__in=imported).count(), 8)
+        self.assertTrue(all(post.access_mask for post in imported))
+
+
+    def test_view_bulk_rejects_non_positive_batch_size(self):
+        for batch_size in ('0', '-1', 'two'):
+            with self.subTest(batch_size=batch_size):
+                response = self.client.post(
+                    f'{self.post_url}bulk/?batch_size={batch_size}', json.dumps(self.data), content_type='application/x-ndjson'
+                )
+                self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+                self.assertEqual(response.data, {'error': 'batch_size must be a positive integer.'})
+        self.assertFalse(BlogPost.objects.filter(title=self.data['title']).exists())
+
+
+    def test_view_bulk_imports_csv(self):
+        body = 'title,content,content_html,permissions\r\n"Csv post",Text,<p>Text</p>,"' + json.dumps(self.data['permissions']).replace('"', '""') + '"\r\n'
+        response = self.client.post(f'{self.post_url}bulk/', body, content_type='text/csv')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(response.data, {'created': 1, 'errors': []})
+        self.assertTrue(BlogPost.objects.filter(title='Csv post', author=self.user).exists())
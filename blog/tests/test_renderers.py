@@ -0,0 +1,37 @@
+from datetime import date, datetime, timezone
+from unittest import skipUnless
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from blog.api import renderers
+from blog.api.renderers import FastJSONRenderer
+from blog.management.commands.benchmark_renderers import sample_page
+
+
+@skipUnless(renderers.orjson, 'orjson is not installed')
+class FastJSONRendererTest(SimpleTestCase):
+
+    def assertSameBytes(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type)
+        )
+
+    def test_matches_default_renderer(self):
+        self.assertSameBytes(sample_page(100))
+        self.assertSameBytes(ReturnDict({
+            'naive': datetime(2024, 1, 1, 8, 0),
+            'utc': datetime(2024, 1, 1, 8, 0, 0, 1, tzinfo=timezone.utc),
+            'date': date(2024, 1, 1),
+            'text': 'tab\there "quoted" \\ ñ  ',
+            1: {'ids': {3}, 'empty': []}
+        }, serializer=None))
+        self.assertSameBytes(None)
+
+    def test_falls_back_for_indented_output(self):
+        self.assertSameBytes({'id': 1}, 'application/json; indent=4')
+
+    def test_falls_back_when_orjson_cannot_encode(self):
+        self.assertSameBytes({'big': 2 ** 70})
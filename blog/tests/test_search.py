@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.db import connection
+from rest_framework.status import *
+
+from .setup import AuthenticateSetUp
+from permission.models import PostPermission
+from permission.tests.factories.permission_factories import PostWithPermissionFactory
+
+
+class PostSearchTest(AuthenticateSetUp):
+
+    def setUp(self):
+        super().setUp()
+        self.search_url = f'{self.post_url}search/'
+        for post in (self.post_author, self.post_team, self.post_authenticate):
+            PostWithPermissionFactory.create_batch(4, post=post, permission=self.read)
+
+    def edit_post(self, post, title, content):
+        post.title = title
+        post.content = content
+        post.save()
+
+    def test_search_ranks_title_matches_first(self):
+        self.edit_post(self.post_author, 'Gardening notes', 'Tomatoes need sun.')
+        self.edit_post(self.post_team, 'Weekly report', 'The gardening budget went up.')
+        self.edit_post(self.post_authenticate, 'Weekly report', 'Nothing new.')
+        response = self.client.get(f'{self.search_url}?q=gardening')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual([post['id'] for post in response.data['results']], [self.post_author.id, self.post_team.id])
+        self.assertEqual(response.data['total_count'], 2)
+
+    def test_search_requires_every_word_and_follows_edits(self):
+        self.edit_post(self.post_author, 'Gardening notes', 'Tomatoes need sun.')
+        self.assertEqual(len(self.client.get(f'{self.search_url}?q=tomatoes sun').data['results']), 1)
+        self.assertEqual(len(self.client.get(f'{self.search_url}?q=tomatoes rain').data['results']), 0)
+        self.edit_post(self.post_author, 'Gardening notes', 'Tomatoes need rain.')
+        self.assertEqual(len(self.client.get(f'{self.search_url}?q=tomatoes rain').data['results']), 1)
+        self.post_author.delete()
+        self.assertEqual(len(self.client.get(f'{self.search_url}?q=tomatoes').data['results']), 0)
+
+    def test_search_applies_visibility_rules(self):
+        for post in (self.post_author, self.post_team, self.post_authenticate):
+            self.edit_post(post, 'Shared title', 'Same words "everywhere".')
+        PostPermission.objects.filter(post=self.post_authenticate, category=self.auth).update(permission=self.none)
+        response = self.client.get(f'{self.search_url}?q="everywhere')
+        self.assertEqual({post['id'] for post in response.data['results']}, {self.post_author.id, self.post_team.id})
+
+        self.client.logout()
+        self.assertEqual(len(self.client.get(f'{self.search_url}?q=shared').data['results']), 3)
+        PostPermission.objects.filter(category=self.public).update(permission=self.none)
+        self.assertEqual(len(self.client.get(f'{self.search_url}?q=shared').data['results']), 0)
+
+    def test_search_requires_terms(self):
+        response = self.client.get(f'{self.search_url}?q=  ')
+        self.assertEqual(response.status_code, HTTP_400_BAD_REQUEST)
+
+    def test_search_falls_back_to_substring_matches(self):
+        self.edit_post(self.post_author, 'Gardening notes', 'Tomatoes need sun.')
+        self.edit_post(self.post_team, 'Weekly report', 'The gardening budget went up.')
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            response = self.client.get(f'{self.search_url}?q=GARDENING')
+            self.assertEqual(response.status_code, HTTP_200_OK)
+            self.assertEqual({post['id'] for post in response.data['results']}, {self.post_author.id, self.post_team.id})
+            self.assertEqual(len(self.client.get(f'{self.search_url}?q=gardening sun').data['results']), 1)
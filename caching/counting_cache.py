@@ -0,0 +1,101 @@
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+_MISSING = object()
+
+
+class CountingCache:
+    """
+    Thin wrapper over a configured ``CACHES`` alias that counts hits and misses.
+    The counters are per process.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def shared(self):
+        """ Whether other processes see this alias; a local-memory backend is private to each. """
+        return not isinstance(self.backend, LocMemCache)
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None):
+        value = self.backend.get(key, _MISSING)
+        self._record(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT):
+        """ Returns the cached value, computing and storing ``default()`` on a miss. """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = default()
+            self.set(key, value, timeout)
+        return value
+
+    def get_many(self, keys):
+        """ Returns the cached subset of ``keys`` as a dict; each key counts as a hit or a miss. """
+        keys = list(keys)
+        values = self.backend.get_many(keys)
+        with self._lock:
+            self.hits += len(values)
+            self.misses += len(set(keys)) - len(values)
+        return values
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        self.backend.set(key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT):
+        return self.backend.add(key, value, timeout)
+
+    def incr(self, key, delta=1):
+        """ Atomic on the backends that support it; raises ValueError when the key is missing. """
+        return self.backend.incr(key, delta)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT):
+        self.backend.set_many(data, timeout)
+
+    def delete(self, key):
+        self.backend.delete(key)
+
+    def delete_many(self, keys):
+        self.backend.delete_many(keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+post_bodies = CountingCache('posts')
+post_permissions = CountingCache('permissions')
+reference_data = CountingCache('reference')
+list_counts = CountingCache('default')
+liked_posts = CountingCache('likes')
+visible_posts = CountingCache('visibility')
+
+
+def cache_stats():
+    caches = (post_bodies, post_permissions, reference_data, list_counts, liked_posts, visible_posts)
+    return {cache.alias: cache.stats() for cache in caches}
@@ -0,0 +1,115 @@
+import socketserver
+import threading
+from unittest import skipUnless
+
+from django.core.cache.backends.redis import RedisCache
+from django.test import TestCase
+
+from blog.tests.setup import AuthenticateSetUp
+from permission.tests.factories.permission_factories import PostWithPermissionFactory
+from ..counting_cache import CountingCache, post_bodies, reference_data
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class RespStandIn(socketserver.StreamRequestHandler):
+    """ Speaks just enough of the Redis protocol for django's RedisCache get/set/delete. """
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            self.wfile.write(b'$-1\r\n')
+        elif isinstance(value, int):
+            self.wfile.write(b':%d\r\n' % value)
+        elif isinstance(value, bytes):
+            self.wfile.write(b'$%d\r\n%s\r\n' % (len(value), value))
+        else:
+            self.wfile.write(b'+%s\r\n' % value.encode())
+
+    def handle(self):
+        store = self.server.store
+        while (args := self.read_command()) is not None:
+            command = args[0].upper()
+            if command == b'GET':
+                self.reply(store.get(args[1]))
+            elif command == b'SET':
+                store[args[1]] = args[2]
+                self.reply('OK')
+            elif command == b'DEL':
+                self.reply(sum(store.pop(key, None) is not None for key in args[1:]))
+            elif command == b'FLUSHDB':
+                store.clear()
+                self.reply('OK')
+            else:
+                self.reply('OK')
+
+
+class CountingCacheTest(TestCase):
+
+    def setUp(self):
+        self.cache = CountingCache('default')
+        self.cache.clear()
+
+    def test_counts_hits_and_misses(self):
+        self.assertIsNone(self.cache.get('missing'))
+        self.cache.set('key', 0)
+        self.assertEqual(self.cache.get('key'), 0)
+        self.assertEqual(self.cache.get_or_set('other', lambda: 'value'), 'value')
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 2})
+
+    @skipUnless(redis, 'redis is not installed')
+    def test_redis_backend_against_stand_in(self):
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), RespStandIn)
+        server.store = {}
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            backend = RedisCache(f'redis://127.0.0.1:{server.server_address[1]}/0', {'KEY_PREFIX': 'posts'})
+            backend.set('post-body:1', {'id': 1, 'title': 'cached'})
+            self.assertEqual(backend.get('post-body:1'), {'id': 1, 'title': 'cached'})
+            backend.delete('post-body:1')
+            self.assertIsNone(backend.get('post-body:1'))
+            self.assertEqual(server.store, {})
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class ApiCachesTest(AuthenticateSetUp):
+
+    def test_post_body_is_served_from_cache(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        post_bodies.reset_stats()
+        first = self.client.get(f'{self.post_url}{self.post_author.id}/')
+        second = self.client.get(f'{self.post_url}{self.post_author.id}/')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(post_bodies.stats(), {'hits': 1, 'misses': 1})
+
+    def test_list_rows_reuse_cached_bodies(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        first = self.client.get(self.post_url)
+        post_bodies.reset_stats()
+        second = self.client.get(self.post_url)
+        self.assertEqual(first.data['results'], second.data['results'])
+        self.assertEqual(post_bodies.stats(), {'hits': len(second.data['results']), 'misses': 0})
+
+    def test_reference_data_is_invalidated_on_write(self):
+        reference_data.reset_stats()
+        first = self.client.get('/permission/category/')
+        self.assertEqual(len(first.data), 4)
+        self.client.get('/permission/category/')
+        self.assertEqual(reference_data.stats(), {'hits': 1, 'misses': 1})
+        self.author.delete()
+        self.assertEqual(len(self.client.get('/permission/category/').data), 3)
@@ -1,10 +1,241 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import partial
+from hashlib import md5
+
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from caching.counting_cache import list_counts
+from user.principal import request_principal
+
+
+def visibility_class(user):
+    """ Users in the same class see the same rows: anonymous, admin or a given (user, team). """
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_admin:
+        return 'admin'
+    return f'user:{user.id}:team:{user.team_id}'
+
+
+def estimate_count(queryset):
+    """ Row estimate from the PostgreSQL planner, None on other databases. """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountStrategyPaginator(DjangoPaginator):
+    """ Django paginator whose total count comes from a pluggable callable. """
+
+    def __init__(self, object_list, per_page, count_strategy=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_strategy = count_strategy
+
+    @cached_property
+    def count(self):
+        if self.count_strategy is None:
+            return self.object_list.count()
+        return self.count_strategy(self.object_list)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seeks on (created_at, id) instead of using OFFSET, so every page costs the same
+    and no COUNT(*) is needed. Cursors are opaque url-safe tokens.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    @staticmethod
+    def position_of(item):
+        """ (created_at, id) of a model instance or of a ``values()`` row. """
+        if isinstance(item, dict):
+            return item['created_at'], item['id']
+        return item.created_at, item.id
+
+    def encode_cursor(self, item, reverse):
+        created_at, id = self.position_of(item)
+        position = f"{'p' if reverse else 'n'}|{created_at.isoformat()}|{id}"
+        token = urlsafe_b64encode(position.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            direction, created_at, id = urlsafe_b64decode(token.encode()).decode().split('|')
+            created_at = parse_datetime(created_at)
+            if direction not in ('n', 'p') or created_at is None:
+                raise ValueError
+            return direction == 'p', created_at, int(id)
+        except (BinasciiError, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[0]
+        if cursor is not None:
+            _, created_at, id = cursor
+            if reverse:
+                seek = Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=id)
+            else:
+                seek = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=id)
+            queryset = queryset.filter(seek)
+        ordering = ('created_at', 'id') if reverse else ('-created_at', '-id')
+        items = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(items) > self.page_size
+        items = items[:self.page_size]
+        if reverse:
+            items.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = items
+        return items
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
 
 class BlogPostPagination(PageNumberPagination):
+    """
+    Page numbers by default; ``?pagination=cursor`` or a ``cursor`` switches to keyset
+    pages and ``?count=false`` skips the total count. Otherwise the count follows
+    ``PAGINATION_COUNT_STRATEGY``.
+    """
     page_size = 10
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    django_paginator_class = CountStrategyPaginator
+
+    def use_cursor(self, request):
+        return (request.query_params.get(self.mode_query_param) == 'cursor'
+                or KeysetPagination.cursor_query_param in request.query_params)
+
+    def skip_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('false', '0', 'no')
+
+    def count_cache_key(self, queryset, request):
+        ignored = {self.page_query_param, self.count_query_param, self.mode_query_param, 'fields'}
+        filters = sorted((key, value) for key, value in request.query_params.lists() if key not in ignored)
+        digest = md5(repr(filters).encode()).hexdigest()
+        return f'list-count:{queryset.model._meta.label_lower}:{visibility_class(request_principal(request))}:{digest}'
+
+    def get_count_strategy(self, request):
+        strategy = getattr(settings, 'PAGINATION_COUNT_STRATEGY', 'exact')
+        if strategy == 'cached':
+            timeout = getattr(settings, 'PAGINATION_COUNT_TIMEOUT', 60)
+            return lambda queryset: list_counts.get_or_set(self.count_cache_key(queryset, request), queryset.count, timeout)
+        if strategy == 'estimated':
+            threshold = getattr(settings, 'PAGINATION_ESTIMATE_THRESHOLD', 100000)
+            def estimated(queryset):
+                estimate = estimate_count(queryset)
+                return estimate if estimate is not None and estimate > threshold else queryset.count()
+            return estimated
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = KeysetPagination(self.page_size) if self.use_cursor(request) else None
+        if self.keyset:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.counted = not self.skip_count(request)
+        if not self.counted:
+            return self.paginate_without_count(queryset, request)
+        self.django_paginator_class = partial(CountStrategyPaginator, count_strategy=self.get_count_strategy(request))
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_window(self, window, queryset, request):
+        """
+        Numbered page of ``queryset`` whose ids and total come from a cached ``window``
+        of it, so only the page rows are read. None when the window cannot answer the
+        request: cursor or uncounted pages, or a page past its end.
+        """
+        if window is None or self.use_cursor(request) or self.skip_count(request):
+            return None
+        paginator = CountStrategyPaginator(window.ids, self.page_size, count_strategy=lambda ids: window.count)
+        try:
+            page = paginator.page(request.query_params.get(self.page_query_param) or 1)
+        except InvalidPage:
+            return None
+        if page.end_index() > len(window.ids):
+            return None
+        self.keyset = None
+        self.counted = True
+        self.request = request
+        self.page = page
+        rows = {row['id']: row for row in queryset.filter(id__in=page.object_list)}
+        return [rows[id] for id in page.object_list if id in rows]
+
+    def paginate_without_count(self, queryset, request):
+        self.request = request
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        offset = (self.page_number - 1) * self.page_size
+        items = list(queryset[offset:offset + self.page_size + 1])
+        self.has_next = len(items) > self.page_size
+        return items[:self.page_size]
+
+    def get_uncounted_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
 
     def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        if not self.counted:
+            return Response({
+                'next': self.get_uncounted_link(self.page_number + 1) if self.has_next else None,
+                'previous': self.get_uncounted_link(self.page_number - 1) if self.page_number > 1 else None,
+                'total_count': None,
+                'current_page': self.page_number,
+                'total_pages': None,
+                'results': data
+            })
         return Response({
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
@@ -14,9 +245,16 @@ class BlogPostPagination(PageNumberPagination):
             'results': data
         })
 
+class SearchPagination(BlogPostPagination):
+    """ Ranked results have no (created_at, id) order to seek on, so pages are numbered only. """
+
+    def use_cursor(self, request):
+        return False
+
+
 class LikePagination(BlogPostPagination):
     page_size = 15
 
 
 class CommentPagination(BlogPostPagination):
-    page_size = 5
\ No newline at end of file
+    page_size = 5
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:02
+
+from django.db import migrations
+
+# Frozen copy of AccessMask as of this migration: a read bit and an edit bit per
+# category, in this order. Later changes to the model code must not change history.
+CATEGORIES = ('public', 'auth', 'team', 'author')
+
+
+def mask_of(permissions):
+    mask = 0
+    for category, permission in permissions:
+        if category not in CATEGORIES:
+            continue
+        read_bit = 1 << (2 * CATEGORIES.index(category))
+        if permission == 'edit':
+            mask |= read_bit | read_bit << 1
+        elif permission == 'read':
+            mask |= read_bit
+    return mask
+
+
+def backfill_access_mask(apps, schema_editor):
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    PostPermission = apps.get_model('permission', 'PostPermission')
+    permissions = {}
+    rows = PostPermission.objects.values_list('post_id', 'category__name', 'permission__name')
+    for post_id, category, permission in rows.iterator():
+        permissions.setdefault(post_id, []).append((category, permission))
+    posts_by_mask = {}
+    for post_id, post_permissions in permissions.items():
+        posts_by_mask.setdefault(mask_of(post_permissions), []).append(post_id)
+    for mask, ids in posts_by_mask.items():
+        BlogPost.objects.filter(pk__in=ids).update(access_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_blogpost_access_mask'),
+        ('permission', '0009_alter_category_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_access_mask, migrations.RunPython.noop),
+    ]
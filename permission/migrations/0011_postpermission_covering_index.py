@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_list_indexes'),
+        ('permission', '0010_backfill_post_access_mask'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postpermission',
+            index=models.Index(fields=['post', 'category', 'permission'], name='post_category_permission_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 
 from blog.models import BaseAbstractModel, BlogPost
+from caching.counting_cache import reference_data
+from .snapshots import invalidate_post_snapshots
 
 class PermissionName(models.TextChoices):
     READ = ('read', 'Read')
@@ -13,9 +15,69 @@ class CategoryName(models.TextChoices):
     TEAM = ('team', 'Team')
     AUTHOR = ('author', 'Author')
 
-class Permission(BaseAbstractModel):
+class AccessMask:
+    """
+    Bit layout of ``BlogPost.access_mask``: every category owns a read bit and an
+    edit bit. The read bit is set whenever the category permission is not ``none``
+    so visibility checks only need to test a single bit.
+    """
+    CATEGORIES = (CategoryName.PUBLIC, CategoryName.AUTHENTICATE, CategoryName.TEAM, CategoryName.AUTHOR)
+
+    @classmethod
+    def read_bit(cls, category):
+        return 1 << (2 * cls.CATEGORIES.index(category))
+
+    @classmethod
+    def edit_bit(cls, category):
+        return cls.read_bit(category) << 1
+
+    @classmethod
+    def permission_bits(cls, category, permission):
+        if category not in cls.CATEGORIES:
+            return 0
+        if permission == PermissionName.EDIT:
+            return cls.read_bit(category) | cls.edit_bit(category)
+        if permission == PermissionName.READ:
+            return cls.read_bit(category)
+        return 0
+
+    @classmethod
+    def from_permissions(cls, permissions):
+        """ Builds the mask from an iterable of (category name, permission name) pairs. """
+        mask = 0
+        for category, permission in permissions:
+            mask |= cls.permission_bits(category, permission)
+        return mask
+
+
+class ReferenceDataMixin:
+    """ Caches the whole (small) table in the reference cache and drops it whenever a row changes. """
+    reference_cache_key = None
+
+    @classmethod
+    def reference_rows(cls):
+        """ All rows as ``{'id', 'name'}`` dicts. """
+        return reference_data.get_or_set(cls.reference_cache_key, lambda: list(cls.objects.order_by('id').values('id', 'name')))
+
+    @classmethod
+    def reference_ids(cls):
+        return {row['id'] for row in cls.reference_rows()}
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        reference_data.delete(self.reference_cache_key)
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        reference_data.delete(self.reference_cache_key)
+        return deleted
+
+
+class Permission(ReferenceDataMixin, BaseAbstractModel):
 
     name = models.CharField(("name"), choices=PermissionName, unique=True, max_length=10, default=None)
+
+    reference_cache_key = 'permissions'
     
     class Meta:
         db_table = "permissions"
@@ -25,9 +87,11 @@ class Permission(BaseAbstractModel):
     def __str__(self):
         return self.name
     
-class Category(BaseAbstractModel):
+class Category(ReferenceDataMixin, BaseAbstractModel):
 
     name = models.CharField(("name"), choices=CategoryName, unique=True, max_length=20, default=None)
+
+    reference_cache_key = 'categories'
     
     class Meta:
         db_table = "categories"
@@ -38,17 +102,79 @@ class Category(BaseAbstractModel):
         return self.name
     
 
+def sync_access_mask(post_ids):
+    """ Recomputes ``BlogPost.access_mask`` for the given posts from their permission rows. """
+    post_ids = set(post_ids)
+    if not post_ids:
+        return
+    rows = PostPermission.objects.filter(post_id__in=post_ids).values_list('post_id', 'category__name', 'permission__name')
+    permissions = {post_id: [] for post_id in post_ids}
+    for post_id, category, permission in rows:
+        permissions[post_id].append((category, permission))
+    from .visibility import invalidate_mask_changes
+
+    current = BlogPost.objects.filter(pk__in=post_ids).values_list('id', 'author_team_id', 'access_mask')
+    posts_by_mask = {}
+    changes = []
+    for post_id, team_id, old_mask in current:
+        mask = AccessMask.from_permissions(permissions[post_id])
+        if mask != old_mask:
+            posts_by_mask.setdefault(mask, []).append(post_id)
+            changes.append((team_id, old_mask, mask))
+    for mask, ids in posts_by_mask.items():
+        BlogPost.objects.filter(pk__in=ids).update(access_mask=mask)
+    invalidate_post_snapshots(post_ids)
+    invalidate_mask_changes(changes)
+
+
+class PostPermissionQuerySet(models.QuerySet):
+    """ Keeps the denormalized access mask in sync for bulk writes that skip ``save()``. """
+
+    def update(self, **kwargs):
+        post_ids = list(self.values_list('post_id', flat=True))
+        rows = super().update(**kwargs)
+        sync_access_mask(post_ids)
+        return rows
+
+    def delete(self):
+        post_ids = list(self.values_list('post_id', flat=True))
+        deleted = super().delete()
+        sync_access_mask(post_ids)
+        return deleted
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        sync_access_mask(obj.post_id for obj in objs)
+        return objs
+
+
 class PostPermission(models.Model):
     
     permission = models.ForeignKey(Permission, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='reverse_post')
 
+    objects = PostPermissionQuerySet.as_manager()
+
     class Meta:
         db_table = 'post_category_permissions'
         constraints = [
             models.UniqueConstraint(fields=['post', 'category'], name='unique_post_category')
         ]
+        indexes = [
+            # Covers the permission rows read per post without touching the table.
+            models.Index(fields=['post', 'category', 'permission'], name='post_category_permission_idx')
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        sync_access_mask([self.post_id])
+
+    def delete(self, *args, **kwargs):
+        post_id = self.post_id
+        deleted = super().delete(*args, **kwargs)
+        sync_access_mask([post_id])
+        return deleted
 
     def __str__(self):
         return f'{self.post}, with: {self.category} and {self.permission}'
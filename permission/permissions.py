@@ -1,8 +1,9 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.exceptions import APIException
 
-from user.models import User
-from .models import CategoryName, PermissionName, PostPermission
+from user.principal import Principal, request_principal
+from .models import CategoryName, PermissionName
+from .snapshots import get_post_snapshot
 
 class RetrieveNotAccessException(APIException):
     status_code = 404
@@ -17,16 +18,15 @@ class AuthenticateAndPostEdit(BasePermission):
     def has_permission(self, request, view):
         if not (view.action == 'create' or view.action == 'partial_update' or (self.like_comment_view_set and view.action == 'destroy')):
             return True
-        if request.user.is_authenticated:
+        if request_principal(request).is_authenticated:
             return True
 
     def has_object_permission(self, request, view, obj):
         if request.method in ['HEAD', 'OPTIONS']:
             return True
-        user: User = request.user
-        author: User = User.objects.get(id=obj.author.id)
-        post_permissions = PostPermission.objects.filter(post_id=obj.id)
-        post_permissions_dict = {permission.category.name: permission.permission.name for permission in post_permissions}
+        user: Principal = request_principal(request)
+        snapshot = get_post_snapshot(obj.id)
+        post_permissions_dict = snapshot.permissions
         if self.like_comment_view_set or request.method == 'GET':
             if not user.is_authenticated:
                 if post_permissions_dict[str(CategoryName.PUBLIC)] != str(PermissionName.NONE):
@@ -35,14 +35,14 @@ class AuthenticateAndPostEdit(BasePermission):
                     raise RetrieveNotAccessException()
             if user.is_admin:
                 return True
-            if user.id == author.id:
+            if user.id == snapshot.author_id:
                 if post_permissions_dict[str(CategoryName.AUTHOR)] != str(PermissionName.NONE):
                     return True
                 elif self.like_comment_view_set:
                     return False
                 else:
                     raise RetrieveNotAccessException()
-            if user.team.id == author.team.id:
+            if user.team_id == snapshot.author_team_id:
                 if post_permissions_dict[str(CategoryName.TEAM)] != str(PermissionName.NONE):
                     return True
                 elif self.like_comment_view_set:
@@ -63,12 +63,12 @@ class AuthenticateAndPostEdit(BasePermission):
                     return False 
             if user.is_admin:
                 return True
-            if user.id == author.id:
+            if user.id == snapshot.author_id:
                 if post_permissions_dict[str(CategoryName.AUTHOR)] == str(PermissionName.EDIT):
                     return True
                 else:
                     return False
-            if user.team.id == author.team.id:
+            if user.team_id == snapshot.author_team_id:
                 if post_permissions_dict[str(CategoryName.TEAM)] == str(PermissionName.EDIT):
                     return True
                 else:
@@ -0,0 +1,74 @@
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+
+from caching.counting_cache import post_permissions
+from caching.lru import LRUCache
+
+
+class PostPermissionSnapshot(NamedTuple):
+    author_id: int
+    author_team_id: int
+    permissions: dict
+    title: str
+
+
+# post id -> (snapshot, monotonic expiry). Invalidation only reaches this process's LRU, so
+# the expiry bounds how long other processes keep serving a snapshot changed elsewhere.
+post_snapshots = LRUCache(getattr(settings, 'POST_PERMISSION_CACHE_SIZE', 1024))
+
+
+def load_post_snapshot(post_id):
+    from blog.models import BlogPost
+
+    rows = BlogPost.objects.filter(pk=post_id).values_list(
+        'author_id', 'author_team_id', 'title', 'reverse_post__category__name', 'reverse_post__permission__name'
+    )
+    snapshot = None
+    for author_id, author_team_id, title, category, permission in rows:
+        if snapshot is None:
+            snapshot = PostPermissionSnapshot(author_id, author_team_id, {}, title)
+        if category is not None:
+            snapshot.permissions[category] = permission
+    return snapshot
+
+
+def snapshot_key(post_id):
+    return f'post-permissions:v2:{post_id}'
+
+
+def get_post_snapshot(post_id):
+    """
+    Returns the (author, team, category -> permission, title) snapshot of a post. Looks in
+    the process LRU first, for at most ``POST_PERMISSION_CACHE_TTL`` seconds per entry, then
+    in the ``permissions`` cache, then the database. The ``permissions`` cache is skipped
+    unless it is shared: invalidations never reach another process's local memory.
+    """
+    entry = post_snapshots.get(post_id)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    shared = post_permissions.shared
+    snapshot = post_permissions.get(snapshot_key(post_id)) if shared else None
+    if snapshot is None:
+        snapshot = load_post_snapshot(post_id)
+        if snapshot is not None and shared:
+            post_permissions.set(snapshot_key(post_id), snapshot)
+    ttl = getattr(settings, 'POST_PERMISSION_CACHE_TTL', 5)
+    if snapshot is not None and ttl:
+        post_snapshots.set(post_id, (snapshot, time.monotonic() + ttl))
+    return snapshot
+
+
+def invalidate_post_snapshots(post_ids):
+    """ Drops cached snapshots now and again once the surrounding transaction commits. """
+    post_ids = list(post_ids)
+
+    def invalidate():
+        for post_id in post_ids:
+            post_snapshots.delete(post_id)
+        post_permissions.delete_many([snapshot_key(post_id) for post_id in post_ids])
+
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -2,7 +2,7 @@ from datetime import datetime
 from django.test import TestCase
 from django.db import IntegrityError
 
-from ..models import Permission, PermissionName, Category, CategoryName
+from ..models import AccessMask, Permission, PermissionName, Category, CategoryName
 from .factories.permission_factories import *
 
 class PermissionTest(TestCase):
@@ -158,7 +158,28 @@ class PostPermissionTest(TestCase):
         posts_from_db = PostPermission.objects.all()
         perm = posts_from_db.first().permission.id
         self.assertEqual(len(posts_from_db), 1)
-        self.assertEqual(perm, permission2.id)      
-                
+        self.assertEqual(perm, permission2.id)
 
-    
\ No newline at end of file
+    def test_access_mask_follows_post_permissions(self):
+        post = BlogPostFactory()
+        public = CategoryFactory(name=CategoryName.PUBLIC)
+        author = CategoryFactory(name=CategoryName.AUTHOR)
+        read = PermissionFactory(name=PermissionName.READ)
+        edit = PermissionFactory(name=PermissionName.EDIT)
+        none = PermissionFactory(name=PermissionName.NONE)
+
+        PostWithPermissionFactory(post=post, category=public, permission=read)
+        author_permission = PostWithPermissionFactory(post=post, category=author, permission=edit)
+        post.refresh_from_db()
+        self.assertEqual(
+            post.access_mask,
+            AccessMask.read_bit(CategoryName.PUBLIC) | AccessMask.read_bit(CategoryName.AUTHOR) | AccessMask.edit_bit(CategoryName.AUTHOR)
+        )
+
+        PostPermission.objects.filter(post=post, category=public).update(permission=none)
+        post.refresh_from_db()
+        self.assertEqual(post.access_mask, AccessMask.read_bit(CategoryName.AUTHOR) | AccessMask.edit_bit(CategoryName.AUTHOR))
+
+        author_permission.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.access_mask, 0)
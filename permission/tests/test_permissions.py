@@ -0,0 +1,95 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from blog.tests.factories.blog_post_factories import BlogPostFactory
+from user.tests.factories.user_factories import UserFactory
+from ..models import Category, CategoryName, Permission, PermissionName, PostPermission
+from ..permissions import AuthenticateAndPostEdit, RetrieveNotAccessException
+from ..snapshots import post_permissions, post_snapshots, snapshot_key
+from .factories.permission_factories import PostWithPermissionFactory
+
+
+class View:
+    action = 'retrieve'
+
+
+class PostPermissionSnapshotTest(TestCase):
+
+    def setUp(self):
+        post_snapshots.clear()
+        for name in CategoryName:
+            Category.objects.create(name=name)
+        self.read = Permission.objects.create(name=PermissionName.READ)
+        self.none = Permission.objects.create(name=PermissionName.NONE)
+        self.user = UserFactory()
+        self.post = BlogPostFactory()
+        PostWithPermissionFactory.create_batch(4, post=self.post, permission=self.read)
+        self.request = APIRequestFactory().get('/post/')
+        self.request.user = self.user
+
+    def test_warm_check_does_not_query(self):
+        permission = AuthenticateAndPostEdit()
+        self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+        with self.assertNumQueries(0):
+            self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+
+    def test_permission_change_invalidates_snapshot(self):
+        permission = AuthenticateAndPostEdit()
+        self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+        PostPermission.objects.filter(post=self.post).update(permission=self.none)
+        self.assertNotIn(self.post.id, post_snapshots._data)
+        with self.assertRaises(RetrieveNotAccessException):
+            permission.has_object_permission(self.request, View(), self.post)
+
+    def test_process_copy_expires_after_ttl(self):
+        permission = AuthenticateAndPostEdit()
+        self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+        # Another process revokes access: only the shared cache and the database change.
+        with mock.patch('permission.snapshots.invalidate_post_snapshots'), mock.patch('permission.models.invalidate_post_snapshots'):
+            PostPermission.objects.filter(post=self.post).update(permission=self.none)
+        self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+        with mock.patch('permission.snapshots.time.monotonic', return_value=time.monotonic() + 6):
+            with self.assertRaises(RetrieveNotAccessException):
+                permission.has_object_permission(self.request, View(), self.post)
+
+    def test_local_memory_permissions_cache_is_not_used(self):
+        AuthenticateAndPostEdit().has_object_permission(self.request, View(), self.post)
+        self.assertIsNone(post_permissions.get(snapshot_key(self.post.id)))
+
+    def test_shared_permissions_cache_serves_other_processes(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        with override_settings(CACHES={**settings.CACHES, 'permissions': shared}):
+            permission = AuthenticateAndPostEdit()
+            self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+            post_snapshots.clear()
+            with self.assertNumQueries(0):
+                self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+            PostPermission.objects.filter(post=self.post).update(permission=self.none)
+            self.assertIsNone(post_permissions.get(snapshot_key(self.post.id)))
+
+    @override_settings(POST_PERMISSION_CACHE_TTL=0)
+    def test_ttl_zero_disables_process_copy(self):
+        permission = AuthenticateAndPostEdit()
+        self.assertTrue(permission.has_object_permission(self.request, View(), self.post))
+        self.assertEqual(len(post_snapshots), 0)
+
+    def test_lru_evicts_least_recently_used(self):
+        post_snapshots.maxsize, maxsize = 2, post_snapshots.maxsize
+        try:
+            post_snapshots.set(1, 'a')
+            post_snapshots.set(2, 'b')
+            post_snapshots.get(1)
+            post_snapshots.set(3, 'c')
+            self.assertEqual(post_snapshots.get(2), None)
+            self.assertEqual(post_snapshots.get(1), 'a')
+        finally:
+            post_snapshots.maxsize = maxsize
+            post_snapshots.clear()
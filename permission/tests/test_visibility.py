@@ -0,0 +1,114 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase, override_settings
+
+from blog.models import AUTHENTICATE_READ_BIT, PUBLIC_READ_BIT, BlogPost, Like
+from blog.tests.factories.blog_post_factories import BlogPostFactory
+from blog.tests.setup import clear_caches
+from user.principal import Principal
+from user.tests.factories.user_factories import TeamFactory, UserFactory
+from ..models import AccessMask, Category, CategoryName, Permission, PermissionName, PostPermission
+from ..visibility import readable_by, visible_window
+from .factories.permission_factories import PostWithPermissionFactory
+
+
+class VisibilitySetUp(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        for name in CategoryName:
+            Category.objects.create(name=name)
+        self.read = Permission.objects.create(name=PermissionName.READ)
+        self.none = Permission.objects.create(name=PermissionName.NONE)
+        self.team = TeamFactory()
+        self.other_team = TeamFactory()
+        self.user = UserFactory(team=self.team)
+        self.teammate = UserFactory(team=self.team)
+        self.own_post = BlogPostFactory(author=self.user)
+        self.team_post = BlogPostFactory(author=self.teammate)
+        self.other_post = BlogPostFactory(author=UserFactory(team=self.other_team))
+        for post in (self.own_post, self.team_post, self.other_post):
+            PostWithPermissionFactory.create_batch(4, post=post, permission=self.read)
+
+    def revoke(self, post, category):
+        PostPermission.objects.filter(post=post, category__name=category).update(permission=self.none)
+
+
+class ReadableByTest(VisibilitySetUp):
+
+    def readable(self, user):
+        return set(BlogPost.objects.filter(readable_by(user)).values_list('id', flat=True))
+
+    def test_anonymous_users_read_public_posts(self):
+        self.revoke(self.other_post, CategoryName.PUBLIC)
+        self.assertEqual(self.readable(AnonymousUser()), {self.own_post.id, self.team_post.id})
+
+    def test_each_post_is_judged_by_the_users_category(self):
+        self.revoke(self.own_post, CategoryName.AUTHOR)
+        self.revoke(self.team_post, CategoryName.AUTHENTICATE)
+        self.assertEqual(self.readable(self.user), {self.team_post.id, self.other_post.id})
+        self.assertEqual(self.readable(self.teammate), {self.own_post.id, self.team_post.id, self.other_post.id})
+        self.assertIsNone(readable_by(Principal(self.user.id, self.team.id, True, True)))
+
+    def test_team_change_is_seen_at_once(self):
+        self.revoke(self.team_post, CategoryName.TEAM)
+        self.assertEqual(self.readable(self.user), {self.own_post.id, self.other_post.id})
+        self.teammate.team = self.other_team
+        self.teammate.save()
+        self.assertEqual(self.readable(self.user), {self.own_post.id, self.team_post.id, self.other_post.id})
+
+    def test_filter_does_not_grow_with_the_posts(self):
+        def params():
+            return Like.objects.filter(readable_by(self.user, 'post__')).query.sql_with_params()[1]
+
+        few = params()
+        BlogPostFactory.create_batch(20, author=self.teammate)
+        self.assertEqual(params(), few)
+
+    def test_filter_joins_nothing(self):
+        self.assertNotIn('JOIN', str(BlogPost.objects.filter(readable_by(self.user)).query))
+        self.assertEqual(self.readable(self.user), {self.own_post.id, self.team_post.id, self.other_post.id})
+
+    def test_partial_indexes_use_the_access_mask_bits(self):
+        self.assertEqual(PUBLIC_READ_BIT, AccessMask.read_bit(CategoryName.PUBLIC))
+        self.assertEqual(AUTHENTICATE_READ_BIT, AccessMask.read_bit(CategoryName.AUTHENTICATE))
+
+
+class VisibleWindowTest(VisibilitySetUp):
+
+    def test_anonymous_users_share_one_window(self):
+        self.revoke(self.other_post, CategoryName.PUBLIC)
+        self.assertEqual(visible_window(AnonymousUser()).ids, [self.team_post.id, self.own_post.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(visible_window(AnonymousUser()).count, 2)
+        self.revoke(self.team_post, CategoryName.PUBLIC)
+        self.assertEqual(visible_window(AnonymousUser()).ids, [self.own_post.id])
+
+    def test_teammates_share_a_window_that_follows_permission_changes(self):
+        self.revoke(self.other_post, CategoryName.AUTHENTICATE)
+        self.assertEqual(visible_window(self.user).ids, [self.team_post.id, self.own_post.id])
+        with self.assertNumQueries(1):
+            # Only the check that the teammate's own posts follow the team rule.
+            self.assertEqual(visible_window(self.teammate).ids, [self.team_post.id, self.own_post.id])
+        PostPermission.objects.filter(post=self.other_post, category__name=CategoryName.AUTHENTICATE).update(permission=self.read)
+        self.assertEqual(visible_window(self.user).ids, [self.other_post.id, self.team_post.id, self.own_post.id])
+
+    def test_moving_an_author_refreshes_both_teams(self):
+        self.revoke(self.team_post, CategoryName.AUTHENTICATE)
+        outsider = UserFactory(team=self.other_team)
+        self.assertIn(self.team_post.id, visible_window(self.user).ids)
+        self.assertNotIn(self.team_post.id, visible_window(outsider).ids)
+        self.teammate.team = self.other_team
+        self.teammate.save()
+        self.assertNotIn(self.team_post.id, visible_window(self.user).ids)
+        self.assertIn(self.team_post.id, visible_window(outsider).ids)
+
+    def test_admins_and_users_with_own_rules_are_not_shared(self):
+        self.assertIsNone(visible_window(Principal(self.user.id, self.team.id, True, True)))
+        self.revoke(self.own_post, CategoryName.AUTHOR)
+        self.assertIsNone(visible_window(self.user))
+        self.assertIsNotNone(visible_window(self.teammate))
+
+    @override_settings(VISIBLE_POSTS_CACHE_SIZE=2)
+    def test_window_keeps_the_head_and_the_total(self):
+        window = visible_window(self.user)
+        self.assertEqual((window.ids, window.count), ([self.other_post.id, self.team_post.id], 3))
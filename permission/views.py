@@ -10,13 +10,19 @@ from rest_framework.generics import ListAPIView
 from .serializers import PermissionSerializer, CategorySerializer
 
 
-class PermissionView(ListAPIView):
+class ReferenceListMixin:
+    """ Serves the whole list from the ``reference`` cache; the models drop the key on writes. """
+
+    def list(self, request, *args, **kwargs):
+        return Response(self.get_serializer().Meta.model.reference_rows())
+
+class PermissionView(ReferenceListMixin, ListAPIView):
     serializer_class=PermissionSerializer
     
     def get_queryset(self):
         return self.get_serializer().Meta.model.objects.all()
 
-class CategoryView(ListAPIView):
+class CategoryView(ReferenceListMixin, ListAPIView):
     serializer_class=CategorySerializer
     
     def get_queryset(self):
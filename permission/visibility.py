@@ -0,0 +1,128 @@
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.lookups import Exact
+
+from caching.counting_cache import visible_posts
+from .models import AccessMask, CategoryName
+
+
+def can_read(category, prefix=''):
+    bit = AccessMask.read_bit(category)
+    return Q(Exact(F(f'{prefix}access_mask').bitand(bit), bit))
+
+
+def readable_by(user, prefix=''):
+    """
+    Filter on the posts the user may read, None for admins. ``prefix`` reaches the post
+    from another model, e.g. ``post__`` for likes and comments. It only reads columns of
+    the post, the access mask and the author and author team ids, so it joins nothing.
+    """
+    if not user.is_authenticated:
+        return can_read(CategoryName.PUBLIC, prefix)
+    if user.is_admin:
+        return None
+    own = Q(**{f'{prefix}author_id': user.id})
+    team = Q(**{f'{prefix}author_team_id': user.team_id})
+    return (
+        (own & can_read(CategoryName.AUTHOR, prefix)) |
+        (~own & team & can_read(CategoryName.TEAM, prefix)) |
+        (~own & ~team & can_read(CategoryName.AUTHENTICATE, prefix))
+    )
+
+
+class VisibleWindow(NamedTuple):
+    """ The first ids of a post list in list order and the length of the whole list. """
+    ids: list
+    count: int
+
+
+def generation_key(name):
+    return f'visible-posts:generation:{name}'
+
+
+def generation(name):
+    """ Current generation of a window class: 'anonymous', 'team:<id>' or 'teams' for all teams. """
+    key = generation_key(name)
+    value = visible_posts.get(key)
+    if value is None:
+        # A fresh start never reuses the generation of a window written before an eviction.
+        visible_posts.add(key, time.time_ns(), None)
+        value = visible_posts.get(key)
+    return value
+
+
+def bump_generations(*names):
+    """ Moves the classes on to new windows, now and once the transaction commits. """
+    names = set(names)
+
+    def bump():
+        for name in names:
+            try:
+                visible_posts.incr(generation_key(name))
+            except ValueError:
+                visible_posts.add(generation_key(name), time.time_ns(), None)
+
+    if names:
+        bump()
+        transaction.on_commit(bump)
+
+
+def load_window(condition):
+    from blog.models import BlogPost
+
+    posts = BlogPost.objects.filter(condition)
+    size = getattr(settings, 'VISIBLE_POSTS_CACHE_SIZE', 200)
+    ids = list(posts.order_by('-created_at', '-id').values_list('id', flat=True)[:size])
+    return VisibleWindow(ids, len(ids) if len(ids) < size else posts.count())
+
+
+def visible_window(user):
+    """
+    The head of the user's post list, shared by every anonymous user and by every
+    member of a team. None for admins and for users whose own posts are not judged
+    the way their teammates judge them (author and team read bits differ), whose list
+    is their own. Callers still filter rows with ``readable_by``; the window only picks
+    which ids to read.
+    """
+    if user.is_authenticated and user.is_admin:
+        return None
+    timeout = getattr(settings, 'VISIBLE_POSTS_CACHE_TIMEOUT', 30)
+    if not user.is_authenticated:
+        key = f"visible-posts:anonymous:{generation('anonymous')}"
+        return visible_posts.get_or_set(key, lambda: load_window(can_read(CategoryName.PUBLIC)), timeout)
+    from blog.models import BlogPost
+
+    bits = AccessMask.read_bit(CategoryName.AUTHOR) | AccessMask.read_bit(CategoryName.TEAM)
+    own_posts = BlogPost.objects.filter(author_id=user.id).annotate(judged=F('access_mask').bitand(bits))
+    if own_posts.exclude(judged__in=(0, bits)).exists():
+        return None
+    team = Q(author_team_id=user.team_id)
+    condition = (team & can_read(CategoryName.TEAM)) | (~team & can_read(CategoryName.AUTHENTICATE))
+    key = f"visible-posts:team:{user.team_id}:{generation(f'team:{user.team_id}')}:{generation('teams')}"
+    return visible_posts.get_or_set(key, lambda: load_window(condition), timeout)
+
+
+def invalidate_mask_changes(changes):
+    """
+    Bumps only the classes a mask change can affect. ``changes`` holds
+    (author team id, old mask, new mask) tuples.
+    """
+    names = set()
+    for team_id, old_mask, new_mask in changes:
+        changed = old_mask ^ new_mask
+        if changed & AccessMask.read_bit(CategoryName.PUBLIC):
+            names.add('anonymous')
+        if changed & AccessMask.read_bit(CategoryName.TEAM):
+            names.add(f'team:{team_id}')
+        if changed & AccessMask.read_bit(CategoryName.AUTHENTICATE):
+            names.add('teams')
+    bump_generations(*names)
+
+
+def invalidate_teams(*team_ids):
+    """ For posts moving between teams with their author. """
+    bump_generations(*{f'team:{team_id}' for team_id in team_ids if team_id is not None})
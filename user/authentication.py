@@ -0,0 +1,48 @@
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import User
+from .tokens import resolve_token, token_digest
+
+
+class TokenUser:
+    """ Stands in for the user model on token authenticated requests. """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, principal, email):
+        self.id = self.pk = principal.id
+        self.team_id = principal.team_id
+        self.is_admin = principal.is_admin
+        self.email = email
+
+    @property
+    def nickname(self):
+        return User.nickname_of(self.email)
+
+
+class BearerTokenAuthentication(BaseAuthentication):
+    """
+    ``Authorization: Bearer <key>`` with keys issued by login. Needs no CSRF token and
+    no session; ``request.auth`` is the token digest.
+    """
+    keyword = b'bearer'
+
+    def authenticate(self, request):
+        parts = get_authorization_header(request).split()
+        if not parts or parts[0].lower() != self.keyword:
+            return None
+        if len(parts) != 2:
+            raise AuthenticationFailed('Invalid token header.')
+        try:
+            key = parts[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed('Invalid token header.')
+        resolved = resolve_token(key)
+        if resolved is None:
+            raise AuthenticationFailed('Invalid token.')
+        request._principal = resolved[0]
+        return TokenUser(*resolved), token_digest(key)
+
+    def authenticate_header(self, request):
+        return 'Bearer'
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired rows from django_session in batches, like clearsessions without one huge DELETE.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sessions deleted per statement.')
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE.endswith('signed_cookies'):
+            self.stdout.write('Signed cookie sessions are not stored; nothing to purge.')
+            return
+        batch_size = options['batch_size']
+        now = timezone.now()
+        deleted = 0
+        while True:
+            # Walks the expire_date index; every batch is its own short transaction.
+            batch = list(Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted += Session.objects.filter(session_key__in=batch).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions.'))
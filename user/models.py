@@ -1,6 +1,6 @@
 from typing import Any
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 class CustomUserManager(BaseUserManager):
@@ -31,6 +31,14 @@ class Team(models.Model):
     class Meta:
         db_table = "teams"
 
+    def delete(self, *args, **kwargs):
+        from permission.visibility import bump_generations
+
+        deleted = super().delete(*args, **kwargs)
+        # Members and their posts fall back to the default team in a cascade User.save never sees.
+        bump_generations('teams')
+        return deleted
+
     def __str__(self):
         return self.name
 
@@ -50,11 +58,69 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     @property
     def nickname(self):
-        return self.email[:self.email.find('@')]
+        return self.nickname_of(self.email)
+
+    @staticmethod
+    def nickname_of(email):
+        return email[:email.find('@')]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_team_id = dict(zip(field_names, values)).get('team_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        loaded_team_id = getattr(self, '_loaded_team_id', None)
+        if loaded_team_id is not None and loaded_team_id != self.team_id:
+            from permission.snapshots import invalidate_post_snapshots
+            from permission.visibility import invalidate_teams
+
+            # The user's posts move to another team: their copy of it and the cached snapshots follow.
+            if self.blogpost_set.update(author_team_id=self.team_id):
+                invalidate_post_snapshots(self.blogpost_set.values_list('id', flat=True))
+                invalidate_teams(loaded_team_id, self.team_id)
+        self._loaded_team_id = self.team_id
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'team', 'team_id', 'is_admin', 'is_active'} & set(update_fields):
+            from .tokens import forget_user_tokens
+
+            forget_user_tokens(self.id)
+
+    def delete(self, *args, **kwargs):
+        from blog.models import Comment, Like, recount_post_counters
+        from .tokens import forget_user_tokens
+
+        forget_user_tokens(self.id)
+        with transaction.atomic():
+            # The cascade drops the user's likes and comments without going through their delete().
+            post_ids = {
+                *Like.objects.filter(user_id=self.id).values_list('post_id', flat=True),
+                *Comment.objects.filter(user_id=self.id).values_list('post_id', flat=True)
+            }
+            deleted = super().delete(*args, **kwargs)
+            recount_post_counters(post_ids)
+        return deleted
 
     class Meta:
         db_table = 'users'
 
     def __str__(self):
         return self.email
-    
+
+
+class AuthToken(models.Model):
+    """ Bearer token of a user. Only the SHA-256 digest of the key handed out is stored. """
+    digest = models.CharField(_("digest"), max_length=64, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='auth_tokens')
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+
+    class Meta:
+        db_table = 'auth_tokens'
+
+    def delete(self, *args, **kwargs):
+        from .tokens import token_principals
+
+        token_principals.delete(self.digest)
+        return super().delete(*args, **kwargs)
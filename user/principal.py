@@ -0,0 +1,26 @@
+from typing import NamedTuple, Optional
+
+
+class Principal(NamedTuple):
+    """ The requesting user as permission and queryset code sees it; never touches the ORM. """
+    id: Optional[int]
+    team_id: Optional[int]
+    is_admin: bool
+    is_authenticated: bool
+
+    @classmethod
+    def of(cls, user):
+        if not user.is_authenticated:
+            return ANONYMOUS
+        return cls(user.id, user.team_id, user.is_admin, True)
+
+
+ANONYMOUS = Principal(None, None, False, False)
+
+
+def request_principal(request):
+    """ Builds the principal of a DRF request once and keeps it on the request. """
+    principal = getattr(request, '_principal', None)
+    if principal is None:
+        principal = request._principal = Principal.of(request.user)
+    return principal
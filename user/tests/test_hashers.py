@@ -0,0 +1,48 @@
+import os
+import runpy
+from unittest import mock
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+
+from ..models import User
+
+PBKDF2 = 'django.contrib.auth.hashers.PBKDF2PasswordHasher'
+SCRYPT = 'user.hashers.TunedScryptPasswordHasher'
+
+
+class PasswordHasherProfileTest(TestCase):
+
+    def login(self, user):
+        return self.client.post(reverse('login'), {'username': user.email, 'password': '223344'}, content_type='application/json')
+
+    def test_tests_use_the_fast_profile(self):
+        user = User.objects.create_user(email="user@mail.com", password="223344")
+        self.assertEqual(identify_hasher(user.password).algorithm, 'md5')
+
+    @override_settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2], SCRYPT_WORK_FACTOR=2 ** 10)
+    def test_login_rehashes_with_the_selected_profile(self):
+        user = User.objects.create_user(email="user@mail.com", password="unused")
+        User.objects.filter(pk=user.pk).update(password=make_password('223344', hasher='pbkdf2_sha256'))
+        self.assertEqual(self.login(user).status_code, HTTP_200_OK)
+        password = User.objects.get(pk=user.pk).password
+        self.assertTrue(password.startswith('scrypt$1024$'))
+
+        with self.settings(SCRYPT_WORK_FACTOR=2 ** 11):
+            self.client.logout()
+            self.assertEqual(self.login(user).status_code, HTTP_200_OK)
+            self.assertTrue(User.objects.get(pk=user.pk).password.startswith('scrypt$2048$'))
+
+    def test_fast_profile_is_refused_outside_test_settings(self):
+        environment = {'PASSWORD_HASHER_PROFILE': 'fast', 'DJANGO_SETTINGS_MODULE': 'avanzatech_blog.settings.prod'}
+        with mock.patch.dict(os.environ, environment):
+            with self.assertRaises(ImproperlyConfigured):
+                runpy.run_module('avanzatech_blog.settings.base')
+
+        with mock.patch.dict(os.environ, {**environment, 'DJANGO_SETTINGS_MODULE': 'avanzatech_blog.settings.test'}):
+            hashers = runpy.run_module('avanzatech_blog.settings.base')['PASSWORD_HASHERS']
+        self.assertEqual(hashers[0], 'django.contrib.auth.hashers.MD5PasswordHasher')
+        self.assertNotIn('django.contrib.auth.hashers.MD5PasswordHasher', hashers[1:])
@@ -0,0 +1,27 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.tests.setup import AuthenticateSetUp
+from permission.tests.factories.permission_factories import PostWithPermissionFactory
+from ..principal import ANONYMOUS, Principal
+
+
+class PrincipalTest(AuthenticateSetUp):
+
+    def test_principal_of_user(self):
+        principal = Principal.of(self.user)
+        self.assertEqual(principal, (self.user.id, self.user.team_id, False, True))
+        self.assertIs(Principal.of(AnonymousUser()), ANONYMOUS)
+        with self.assertRaises(AttributeError):
+            principal.is_admin = True
+
+    def test_request_loads_user_and_team_once(self):
+        PostWithPermissionFactory.create_batch(4, post=self.post_author, permission=self.read)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.post_url)
+        self.assertEqual(response.status_code, 200)
+        user_queries = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT "users"')]
+        self.assertEqual(len(user_queries), 1)
+        self.assertIn('INNER JOIN "teams"', user_queries[0])
+        self.assertFalse(any(query['sql'].startswith('SELECT "teams"') for query in queries.captured_queries))
@@ -0,0 +1,63 @@
+import os
+import runpy
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import User
+
+
+class SessionModeTest(TestCase):
+
+    def login(self):
+        User.objects.create_user(email="user@mail.com", password="223344")
+        self.client.post(reverse('login'), {'username': 'user@mail.com', 'password': '223344'}, content_type='application/json')
+        self.assertIn('_auth_user_id', self.client.session)
+
+    def session_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/post/')
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries.captured_queries if 'django_session' in query['sql']]
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions_are_not_stored(self):
+        self.login()
+        self.assertEqual(Session.objects.count(), 0)
+        self.assertEqual(self.session_queries(), [])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db')
+    def test_cached_db_sessions_are_read_from_cache(self):
+        self.login()
+        self.assertEqual(Session.objects.count(), 1)
+        self.assertEqual(self.session_queries(), [])
+
+    def test_cached_db_is_refused_on_local_memory_caches(self):
+        with mock.patch.dict(os.environ, {'SESSION_MODE': 'cached_db', 'CACHE_BACKEND': 'locmem'}):
+            with self.assertRaises(ImproperlyConfigured):
+                runpy.run_module('avanzatech_blog.settings.base')
+
+
+class PurgeSessionsTest(TestCase):
+
+    def test_purge_deletes_only_expired_sessions_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)] +
+            [Session(session_key='active', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_sessions', batch_size=2, stdout=out)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['active'])
+        self.assertIn('Deleted 5 expired sessions.', out.getvalue())
+        self.assertEqual(len([query for query in queries.captured_queries if query['sql'].startswith('DELETE')]), 3)
@@ -0,0 +1,53 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.status import *
+from rest_framework.test import APITestCase
+
+from blog.tests.setup import clear_caches
+from ..models import AuthToken, User
+from ..tokens import token_principals
+from .factories.user_factories import TeamFactory
+
+
+class BearerTokenTest(APITestCase):
+
+    def setUp(self):
+        clear_caches()
+        token_principals.clear()
+        self.user = User.objects.create_user(email="user@mail.com", password="223344")
+        response = self.client.post(reverse('login'), {'username': self.user.email, 'password': '223344', 'token': True}, format='json')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.token = response.data['token']
+        self.assertNotIn('sessionid', response.cookies)
+
+    def get_posts(self, token=None):
+        return self.client.get('/like/', HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+
+    def test_token_authenticates_without_queries_once_warm(self):
+        self.assertEqual(self.get_posts().status_code, HTTP_200_OK)
+        self.assertEqual(len(token_principals), 1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_posts()
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        auth_queries = [query['sql'] for query in queries.captured_queries
+                        if query['sql'].startswith(('SELECT "auth_tokens"', 'SELECT "users"', 'SELECT "django_session"'))]
+        self.assertEqual(auth_queries, [])
+
+    def test_invalid_token_is_rejected(self):
+        self.assertEqual(self.get_posts('not-a-token').status_code, HTTP_403_FORBIDDEN)
+
+    def test_logout_revokes_token(self):
+        response = self.client.get(reverse('logout'), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, HTTP_200_OK)
+        self.assertEqual(AuthToken.objects.count(), 0)
+        self.assertEqual(self.get_posts().status_code, HTTP_403_FORBIDDEN)
+
+    def test_cached_principal_follows_user_changes(self):
+        self.get_posts()
+        self.user.team = TeamFactory(id=2, name='other team')
+        self.user.save()
+        self.assertEqual(len(token_principals), 0)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_posts().status_code, HTTP_403_FORBIDDEN)
@@ -0,0 +1,62 @@
+import hashlib
+import secrets
+import time
+
+from django.conf import settings
+
+from caching.lru import LRUCache
+from .principal import Principal
+
+# digest -> (principal, email, monotonic expiry). The expiry bounds how long another process
+# keeps serving a token revoked elsewhere; revocations in this process are immediate.
+token_principals = LRUCache(getattr(settings, 'TOKEN_CACHE_SIZE', 4096))
+
+
+def token_digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def issue_token(user):
+    """ Creates a token for the user and returns its key; the key itself is never stored. """
+    from .models import AuthToken
+
+    key = secrets.token_urlsafe(32)
+    AuthToken.objects.create(digest=token_digest(key), user=user)
+    return key
+
+
+def resolve_token(key):
+    """
+    Returns (principal, email) of an active token key, or None. Warm lookups are
+    served from the process LRU without touching the database.
+    """
+    from .models import AuthToken
+
+    digest = token_digest(key)
+    entry = token_principals.get(digest)
+    if entry is not None and entry[2] > time.monotonic():
+        return entry[:2]
+    row = AuthToken.objects.filter(digest=digest, user__is_active=True).values_list(
+        'user_id', 'user__team_id', 'user__is_admin', 'user__email'
+    ).first()
+    if row is None:
+        token_principals.delete(digest)
+        return None
+    principal = Principal(*row[:3], is_authenticated=True)
+    token_principals.set(digest, (principal, row[3], time.monotonic() + getattr(settings, 'TOKEN_CACHE_TTL', 300)))
+    return principal, row[3]
+
+
+def revoke_token(digest):
+    from .models import AuthToken
+
+    AuthToken.objects.filter(digest=digest).delete()
+    token_principals.delete(digest)
+
+
+def forget_user_tokens(user_id):
+    """ Drops the cached principals of a user whose team, role or status changed. """
+    from .models import AuthToken
+
+    for digest in AuthToken.objects.filter(user_id=user_id).values_list('digest', flat=True):
+        token_principals.delete(digest)
@@ -6,7 +6,9 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.status import *
 
+from .authentication import BearerTokenAuthentication
 from .serializers import ListUserSerializer, UserSerializer
+from .tokens import issue_token, revoke_token
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -15,8 +17,18 @@ def login_view(request: Request):
     password = request.data.get('password', '')
     user = authenticate(request, username=username, password=password)
     if user is not None:
-        login(request, user)
         user_serializer = ListUserSerializer(user)
+        if request.data.get('token'):
+            # Bearer token clients get a key instead of a session.
+            return Response(
+                {
+                    'message': 'Successful Login',
+                    'user': user_serializer.data,
+                    'token': issue_token(user)
+                },
+                status=HTTP_200_OK
+            )
+        login(request, user)
         return Response(
             {
                 'message': 'Successful Login',
@@ -30,6 +42,8 @@ def login_view(request: Request):
 
 @api_view(['GET'])
 def logout_view(request):
+    if isinstance(request.successful_authenticator, BearerTokenAuthentication):
+        revoke_token(request.auth)
     logout(request)
     return Response({'message': 'Successful Logout'}, status=HTTP_200_OK)
 